@@ -0,0 +1,134 @@
+"""
+Mood analytics rollups for AI Travel Chatbot
+Folds new search_history rows into the mood rollup tables so that mood trends
+can be served without scanning search history. Run it periodically (e.g. from
+cron); each run only reads searches added since the previous one.
+
+Usage:
+    python analytics.py            # fold in new searches
+    python analytics.py --rebuild  # recompute every rollup from scratch
+"""
+
+import argparse
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+
+from sqlalchemy import inspect
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from models import db, SearchHistory, MoodDailyRollup, MoodRollup, MoodDestinationRollup, RollupCursor
+from models import MOOD_ROLLUP_CURSOR, increment_rollup, lock_rollup_cursor
+
+
+def update_mood_rollups(batch_size=1000):
+    """Fold searches newer than the rollup cursor into the rollup tables"""
+    processed = 0
+
+    while True:
+        # Held until the batch commits, so SearchHistory.set_rating can't change a search mid-fold
+        last_id = lock_rollup_cursor(MOOD_ROLLUP_CURSOR)
+        searches = db.session.query(SearchHistory).filter(SearchHistory.id > last_id)\
+                             .order_by(SearchHistory.id).limit(batch_size).all()
+        if not searches:
+            db.session.commit()
+            break
+
+        daily = defaultdict(Counter)
+        totals = defaultdict(Counter)
+        destinations = Counter()
+        for search in searches:
+            stats = {'search_count': 1}
+            if search.rating:
+                stats.update(rating_sum=search.rating, rating_count=1)
+            daily[(search.timestamp.date(), search.mood)].update(stats)
+            totals[search.mood].update(stats)
+            for destination in search.get_result_dict().get('destinations', []):
+                if destination.get('name'):
+                    destinations[(search.mood, destination['name'][:100])] += 1
+
+        for (day, mood), deltas in daily.items():
+            increment_rollup(MoodDailyRollup, {'day': day, 'mood': mood}, **deltas)
+        for mood, deltas in totals.items():
+            increment_rollup(MoodRollup, {'mood': mood}, **deltas)
+        for (mood, destination), count in destinations.items():
+            increment_rollup(MoodDestinationRollup, {'mood': mood, 'destination': destination}, search_count=count)
+
+        db.session.query(RollupCursor).filter_by(name=MOOD_ROLLUP_CURSOR)\
+                  .update({RollupCursor.last_id: searches[-1].id}, synchronize_session=False)
+        db.session.commit()
+
+        processed += len(searches)
+
+    return processed
+
+
+def rebuild_mood_rollups(batch_size=1000):
+    """Drop every mood rollup and recompute them from search history"""
+    for model in (MoodDailyRollup, MoodRollup, MoodDestinationRollup):
+        db.session.query(model).delete(synchronize_session=False)
+    db.session.query(RollupCursor).filter_by(name=MOOD_ROLLUP_CURSOR).delete(synchronize_session=False)
+    db.session.commit()
+    return update_mood_rollups(batch_size)
+
+
+def get_mood_analytics(days=30, top_destinations=3):
+    """Mood trends read straight from the rollup tables"""
+    since = date.today() - timedelta(days=days - 1)
+    try:
+        daily_rows = db.session.query(MoodDailyRollup).filter(MoodDailyRollup.day >= since)\
+                               .order_by(MoodDailyRollup.day, MoodDailyRollup.mood).all()
+        mood_rows = db.session.query(MoodRollup).order_by(MoodRollup.mood).all()
+        destination_rows = db.session.query(MoodDestinationRollup)\
+                                     .order_by(MoodDestinationRollup.mood,
+                                               MoodDestinationRollup.search_count.desc()).all()
+    except (OperationalError, ProgrammingError):
+        # Databases created before the rollups existed get the tables from `flask init-db` or
+        # analytics.py; until then there is simply nothing to report
+        db.session.rollback()
+        if all(inspect(db.engine).has_table(model.__tablename__)
+               for model in (MoodDailyRollup, MoodRollup, MoodDestinationRollup)):
+            raise
+        daily_rows, mood_rows, destination_rows = [], [], []
+
+    moods = {}
+    for row in mood_rows:
+        moods[row.mood] = {
+            'searches': row.search_count,
+            'rated_searches': row.rating_count,
+            'average_rating': row.get_average_rating(),
+            'top_destinations': []
+        }
+    for row in destination_rows:
+        mood = moods.get(row.mood)
+        if mood is not None and len(mood['top_destinations']) < top_destinations:
+            mood['top_destinations'].append({'name': row.destination, 'searches': row.search_count})
+
+    return {
+        'since': since.isoformat(),
+        'moods_per_day': [
+            {'day': row.day.isoformat(), 'mood': row.mood, 'searches': row.search_count}
+            for row in daily_rows
+        ],
+        'moods': moods
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Update mood analytics rollups')
+    parser.add_argument('--rebuild', action='store_true', help='Recompute all rollups from search history')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Searches processed per transaction')
+    args = parser.parse_args()
+
+    from app import create_app
+
+    with create_app().app_context():
+        db.create_all()
+        if args.rebuild:
+            processed = rebuild_mood_rollups(args.batch_size)
+        else:
+            processed = update_mood_rollups(args.batch_size)
+        print(f"✅ Folded {processed} searches into mood rollups")
+
+
+if __name__ == '__main__':
+    main()
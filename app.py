@@ -1,51 +1,119 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session
-from flask_login import LoginManager, login_user, logout_user, login_required, current_user
-from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime, date, timedelta
+from flask import Flask, Blueprint, current_app, render_template, request, redirect, url_for, flash, jsonify, session
+from flask.cli import with_appcontext
+from werkzeug.middleware.proxy_fix import ProxyFix
+from markupsafe import Markup
+from flask_login import LoginManager, login_user, logout_user, login_required, current_user, user_logged_in, user_logged_out
+from datetime import datetime, date, timedelta, timezone
+import click
+import hashlib
 import json
+import logging
+import os
 import re
 import random
 
 # Import local modules
 from config import Config, MOOD_DESTINATIONS
+from catalog import MOOD_KEYWORDS, MOOD_PHRASES, HOTEL_RECOMMENDATIONS, RESTAURANT_RECOMMENDATIONS
+from catalog import DEFAULT_HOTELS, DEFAULT_RESTAURANTS
+from caching import TTLCache
+import compression
+import fast_json
+import images
+import metrics
+import passwords
+import profiling
+import ratelimit
+import server_session
+import sql_stats
+import static_assets
+import structured_logging
+import template_cache
+import tracing
 from models import db, User, SearchHistory, Itinerary, create_user, get_user_by_email, save_search_history, create_itinerary
+from models import user_cache, plan_cache, fragment_cache, get_cached_user, invalidate_user_cache
+from structured_logging import log_event
+from models import get_user_itinerary_summaries, get_user_search_summaries
+from models import get_itinerary_list_version, get_itinerary_version, get_search_history_version, user_owns_itinerary
 
-# Initialize Flask app
-app = Flask(__name__)
-app.config.from_object(Config)
-
-# Initialize extensions
-db.init_app(app)
+# Views live on a blueprint; extensions are bound to an app in create_app()
+bp = Blueprint('main', __name__)
 login_manager = LoginManager()
-login_manager.init_app(app)
-login_manager.login_view = 'login'
+login_manager.login_view = 'main.login'
 login_manager.login_message = 'Please log in to access this page.'
 login_manager.login_message_category = 'info'
+page_cache = TTLCache(ttl=300, maxsize=64)
+
+def create_app(config=None):
+    """Create and configure the Flask application (config: object or dict of overrides)"""
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    if isinstance(config, dict):
+        app.config.update(config)
+    elif config is not None:
+        app.config.from_object(config)
+    app.json = fast_json.FastJSONProvider(app)
+    if app.config['PROXY_FIX_X_FOR']:
+        # Take the client address from the proxy, so logged-out rate limits are per client rather than per proxy
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'])
+    structured_logging.init_app(app)
+    
+    # Initialize extensions
+    db.init_app(app)
+    server_session.init_app(app)
+    login_manager.init_app(app)
+    passwords.init_app(app)
+    user_cache.ttl = app.config['USER_CACHE_TTL']
+    plan_cache.maxsize = app.config['PLAN_CACHE_SIZE']
+    fragment_cache.ttl = app.config['FRAGMENT_CACHE_TTL']
+    page_cache.ttl = app.config['PAGE_CACHE_TTL']
+    # Outermost, so the request span covers the other hooks
+    tracing.init_app(app)
+    # Before the rest, so its hooks see requests rejected by the rate limiter and compressed response sizes
+    metrics.init_app(app)
+    sql_stats.init_app(app)
+    ratelimit.init_app(app)
+    profiling.init_app(app)
+    compression.init_app(app)
+    static_assets.init_app(app)
+    images.init_app(app)
+    template_cache.init_app(app)
+    if not app.config['BUILD_ID']:
+        app.config['BUILD_ID'] = compute_build_id(app)
+    
+    app.register_blueprint(bp)
+    app.cli.add_command(init_db_command)
+    
+    # Compile all templates now instead of on each worker's first requests
+    template_cache.warm_templates(app)
+    return app
 
 @login_manager.user_loader
 def load_user(user_id):
-    return db.session.get(User, int(user_id))
+    stamp = session.get('_credential_stamp')
+    user = get_cached_user(user_id, stamp)
+    if user is not None and stamp is None:
+        # Restored from a remember-me cookie, which carries no stamp
+        session['_credential_stamp'] = user.credential_stamp
+    return user
+
+@user_logged_in.connect
+def stamp_session_credentials(sender, user, **extra):
+    """Record which password and active flag this login was made with (see get_cached_user)"""
+    session['_credential_stamp'] = user.credential_stamp
+
+@user_logged_out.connect
+def clear_session_credentials(sender, user, **extra):
+    session.pop('_credential_stamp', None)
 
 # AI Chatbot Logic
 class TravelChatbot:
     """Simple AI Travel Chatbot with mood-based recommendations"""
     
     def __init__(self):
-        self.mood_keywords = {
-            'calm': ['calm', 'peaceful', 'serene', 'quiet', 'tranquil', 'relaxed', 'zen', 'meditate', 
-                    'peace', 'still', 'silence', 'soothing', 'gentle', 'soft', 'restful', 'mindful'],
-            'excited': ['excited', 'energetic', 'party', 'fun', 'adventure', 'wild', 'crazy', 'lively',
-                       'thrilled', 'enthusiastic', 'pumped', 'hyper', 'upbeat', 'dynamic', 'spirited'],
-            'romantic': ['romantic', 'love', 'couple', 'honeymoon', 'intimate', 'cozy', 'date',
-                        'partner', 'relationship', 'valentine', 'anniversary', 'together', 'romantic getaway'],
-            'adventurous': ['adventurous', 'thrill', 'extreme', 'hiking', 'trekking', 'adrenaline', 'challenge',
-                           'daring', 'bold', 'brave', 'explore', 'discover', 'expedition', 'wilderness'],
-            'stressed': ['stressed', 'tired', 'exhausted', 'overwhelmed', 'need break', 'burnout', 'pressure',
-                        'anxiety', 'tension', 'worried', 'hectic', 'busy', 'overworked', 'mental health'],
-            'happy': ['happy', 'joyful', 'cheerful', 'celebrate', 'vibrant', 'colorful', 'festive',
-                     'elated', 'delighted', 'content', 'pleased', 'optimistic', 'positive', 'good mood']
-        }
+        self.mood_keywords = MOOD_KEYWORDS
     
+    @tracing.traced('chatbot.detect_mood')
     def detect_mood(self, text):
         """Detect mood from user input text"""
         text = text.lower()
@@ -66,16 +134,7 @@ class TravelChatbot:
             mood_scores[mood] = score
         
         # Also check for common phrases
-        mood_phrases = {
-            'stressed': ['need a break', 'feeling overwhelmed', 'work stress', 'too much pressure'],
-            'calm': ['want peace', 'need quiet', 'seek tranquility', 'peaceful place'],
-            'excited': ['want fun', 'party time', 'full of energy', 'ready to explore'],
-            'romantic': ['with partner', 'date night', 'romantic getaway', 'couple trip'],
-            'adventurous': ['want adventure', 'thrill seeking', 'extreme sports', 'mountain climbing'],
-            'happy': ['feeling good', 'want to celebrate', 'in good mood', 'cheerful']
-        }
-        
-        for mood, phrases in mood_phrases.items():
+        for mood, phrases in MOOD_PHRASES.items():
             for phrase in phrases:
                 if phrase in text:
                     mood_scores[mood] = mood_scores.get(mood, 0) + 2
@@ -84,6 +143,7 @@ class TravelChatbot:
         detected_mood = max(mood_scores, key=mood_scores.get) if max(mood_scores.values()) > 0 else 'happy'
         return detected_mood
     
+    @tracing.traced('catalog.recommendations')
     def get_recommendations(self, mood, user_query):
         """Get travel recommendations based on mood"""
         if mood not in MOOD_DESTINATIONS:
@@ -116,120 +176,22 @@ class TravelChatbot:
         
         return mood_messages.get(mood, f"Here are {len(destinations)} amazing destinations in India for you:")
     
+    @tracing.traced('catalog.hotels_and_dining')
     def get_accommodation_and_dining_recommendations(self, destination_name):
         """Get hotel and restaurant recommendations for a destination"""
-        
-        # Hotel recommendations by destination
-        hotel_recommendations = {
-            'Goa': {
-                'luxury': ['Taj Exotica Resort & Spa', 'The Leela Goa', 'Grand Hyatt Goa'],
-                'mid_range': ['Novotel Goa Resort & Spa', 'Holiday Inn Resort Goa', 'Radisson Blu Resort Goa'],
-                'budget': ['OYO Hotels Goa', 'Zostel Goa', 'Backpacker Panda Goa']
-            },
-            'Kerala': {
-                'luxury': ['Kumarakom Lake Resort', 'Taj Green Cove Resort & Spa', 'The Leela Kovalam'],
-                'mid_range': ['Fragrant Nature Backwater Resort', 'Spice Village CGH Earth', 'Casino Hotel Kochi'],
-                'budget': ['Kochi Backpackers', 'Zostel Vashisht', 'Green Woods Bethlehem']
-            },
-            'Rajasthan': {
-                'luxury': ['Taj Lake Palace Udaipur', 'The Oberoi Udaivilas', 'Rambagh Palace Jaipur'],
-                'mid_range': ['Hotel Haveli Inn Pal', 'Umaid Bhawan Palace', 'Tree of Life Resort & Spa'],
-                'budget': ['Zostel Jaipur', 'Moustache Hostel Jaipur', 'Backpacker Panda Jaipur']
-            },
-            'Himachal Pradesh': {
-                'luxury': ['The Oberoi Cecil Shimla', 'Wildflower Hall Shimla', 'Fortune Park Dalhousie'],
-                'mid_range': ['Hotel Snow Valley Resorts', 'Apple Country Resort Manali', 'Hotel Hilltop Shimla'],
-                'budget': ['Zostel Manali', 'Backpacker Panda Kasol', 'The Hosteller Manali']
-            },
-            'Karnataka': {
-                'luxury': ['Taj West End Bangalore', 'The Serai Bandipur', 'Evolve Back Coorg'],
-                'mid_range': ['Club Mahindra Coorg', 'Hotel Mayura Hoysala', 'The Gateway Hotel KR Road'],
-                'budget': ['Zostel Bangalore', 'Backpacker Panda Hampi', 'Gokarna International Beach Resort']
-            },
-            'Maharashtra': {
-                'luxury': ['The Taj Mahal Palace Mumbai', 'JW Marriott Mumbai', 'The St. Regis Mumbai'],
-                'mid_range': ['Hotel Sahyadri Pune', 'Lemon Tree Hotel Mumbai', 'The Pride Hotel Pune'],
-                'budget': ['Zostel Mumbai', 'Backpacker Panda Lonavala', 'YMCA Mumbai']
-            },
-            'Tamil Nadu': {
-                'luxury': ['Taj Fisherman\'s Cove Chennai', 'The Leela Palace Chennai', 'Fortune Resort Bay Island'],
-                'mid_range': ['Hotel Sangam Thanjavur', 'GRT Grand Chennai', 'Sterling Yelagiri'],
-                'budget': ['Zostel Pondicherry', 'Backpacker Panda Kodaikanal', 'Hotel Saravana Bhavan Lodge']
-            }
-        }
-        
-        # Restaurant recommendations by destination
-        restaurant_recommendations = {
-            'Goa': {
-                'fine_dining': ['Thalassa', 'La Plage', 'Bomra\'s'],
-                'local_cuisine': ['Vinayak Family Restaurant', 'Mum\'s Kitchen', 'Fish Curry Rice'],
-                'street_food': ['Goa Bhel', 'Bebinca Cafe', 'Cafe Chocolatti'],
-                'beach_shacks': ['Curlies Beach Shack', 'Shiva Valley', 'Anjuna Beach Restaurant']
-            },
-            'Kerala': {
-                'fine_dining': ['Dhe Puttu', 'Casino Hotel Restaurant', 'The Rice Boat'],
-                'local_cuisine': ['Saravana Bhavan', 'Aryaas Restaurant', 'Hotel Rahmath'],
-                'street_food': ['Kozhikode Biryani Stall', 'Ernakulam Food Street', 'Kochi Spice Market'],
-                'backwater_dining': ['Backwater Ripples', 'Lake Palace Restaurant', 'Coconut Lagoon']
-            },
-            'Rajasthan': {
-                'fine_dining': ['1135 AD Restaurant', 'Ambrai Restaurant', 'Handi Restaurant'],
-                'local_cuisine': ['Chokhi Dhani', 'Laxmi Misthan Bhandar', 'Rawat Mishtan Bhandar'],
-                'street_food': ['Johri Bazaar Food Street', 'Bapu Bazaar', 'Clock Tower Market'],
-                'rooftop_dining': ['Upre Restaurant', 'Sky Deck Lounge', 'Sunset Terrace']
-            },
-            'Himachal Pradesh': {
-                'fine_dining': ['The Restaurant at Wildflower Hall', 'Eighteen71 Cookhouse & Bar', 'Wake & Bake Cafe'],
-                'local_cuisine': ['Sher-e-Punjab', 'Johnson Cafe', 'Cafe 1947'],
-                'mountain_cafes': ['Moon Dance Cafe', 'German Bakery Kasol', 'Evergreen Cafe'],
-                'street_food': ['Mall Road Food Stalls', 'Manali Market', 'Old Manali Cafes']
-            },
-            'Karnataka': {
-                'fine_dining': ['Karavalli', 'Toit Brewpub', 'The Only Place'],
-                'local_cuisine': ['MTR Restaurant', 'Vidyarthi Bhavan', 'Brahmin\'s Coffee Bar'],
-                'street_food': ['VV Puram Food Street', 'Commercial Street Eateries', 'Russell Market'],
-                'coastal_cuisine': ['Gokarna Beach Restaurants', 'Udupi Krishna Bhavan', 'Fisherman\'s Wharf']
-            },
-            'Maharashtra': {
-                'fine_dining': ['Trishna', 'The Table', 'Indigo Delicatessen'],
-                'local_cuisine': ['Britannia & Co.', 'Cafe Madras', 'Hotel Goodluck'],
-                'street_food': ['Mohammed Ali Road', 'Juhu Beach Chaat', 'Crawford Market'],
-                'hill_station': ['Hotel Chandralok Lonavala', 'Rama Krishna Restaurant', 'German Bakery Pune']
-            },
-            'Tamil Nadu': {
-                'fine_dining': ['Dakshin Restaurant', 'Benjarong', 'Peshawri'],
-                'local_cuisine': ['Murugan Idli Shop', 'Saravana Bhavan', 'Hotel Junior Kuppanna'],
-                'street_food': ['Marina Beach Food Stalls', 'T Nagar Food Street', 'Pondy Bazaar'],
-                'temple_food': ['Annapoorna Restaurant', 'Amma Unavagam', 'Krishna Sweets']
-            }
-        }
-        
-        # Default recommendations if destination not found
-        default_hotels = {
-            'luxury': ['Premium Heritage Hotel', 'Luxury Resort & Spa', 'Grand Palace Hotel'],
-            'mid_range': ['Comfort Inn Hotel', 'Best Western Hotel', 'Holiday Resort'],
-            'budget': ['OYO Hotels', 'Budget Backpacker Hostel', 'Economy Lodge']
-        }
-        
-        default_restaurants = {
-            'fine_dining': ['Premium Fine Dining Restaurant', 'Luxury Multi-Cuisine Restaurant'],
-            'local_cuisine': ['Local Traditional Restaurant', 'Authentic Regional Cuisine'],
-            'street_food': ['Local Food Street', 'Traditional Market Eateries'],
-            'cafes': ['Local Coffee House', 'Traditional Tea Stall']
-        }
-        
         # Find matching destination (partial match)
-        hotels = default_hotels
-        restaurants = default_restaurants
+        hotels = DEFAULT_HOTELS
+        restaurants = DEFAULT_RESTAURANTS
         
-        for dest_key in hotel_recommendations.keys():
+        for dest_key in HOTEL_RECOMMENDATIONS.keys():
             if dest_key.lower() in destination_name.lower() or destination_name.lower() in dest_key.lower():
-                hotels = hotel_recommendations[dest_key]
-                restaurants = restaurant_recommendations[dest_key]
+                hotels = HOTEL_RECOMMENDATIONS[dest_key]
+                restaurants = RESTAURANT_RECOMMENDATIONS[dest_key]
                 break
         
         return hotels, restaurants
     
+    @tracing.traced('chatbot.create_itinerary')
     def create_itinerary(self, destination_data, trip_duration=3):
         """Create a detailed itinerary for a destination"""
         destination = destination_data
@@ -313,7 +275,7 @@ class TravelChatbot:
                 
                 # Select restaurants for lunch and dinner
                 lunch_restaurant = selected_restaurants[(day-1) * 2 % len(selected_restaurants)] if selected_restaurants else f"Local {current_food} Restaurant"
-                dinner_restaurant = selected_restaurants[(day-1) * 2 + 1 % len(selected_restaurants)] if selected_restaurants else "Traditional Evening Restaurant"
+                dinner_restaurant = selected_restaurants[((day-1) * 2 + 1) % len(selected_restaurants)] if selected_restaurants else "Traditional Evening Restaurant"
                 
                 activities = [
                     {'time': '9:00 AM', 'title': f'Morning at {current_attraction}', 'description': f'Explore {current_attraction}, learn about its fascinating history and cultural significance', 'tags': ['Sightseeing', 'Culture']},
@@ -378,40 +340,112 @@ class TravelChatbot:
 # Initialize chatbot
 chatbot = TravelChatbot()
 
-# Auto-create database tables and demo user
+# Database bootstrap (run with `flask init-db`)
 def initialize_database():
-    """Initialize database"""
+    """Create database tables and the demo user"""
     try:
-        with app.app_context():
-            db.create_all()
-            print("✅ Database tables created!")
-            
-            # Create demo user if doesn't exist
-            if not get_user_by_email('demo@paradiseride.com'):
-                demo_user = create_user(
-                    name="Demo User",
-                    email="demo@paradiseride.com", 
-                    password="demo123"
-                )
-                if demo_user:
-                    print("✅ Demo user created: demo@paradiseride.com / demo123")
+        db.create_all()
+        print("✅ Database tables created!")
+        
+        # Create demo user if doesn't exist
+        if not get_user_by_email('demo@paradiseride.com'):
+            demo_user = create_user(
+                name="Demo User",
+                email="demo@paradiseride.com", 
+                password="demo123"
+            )
+            if demo_user:
+                print("✅ Demo user created: demo@paradiseride.com / demo123")
     except Exception as e:
         print(f"⚠️ Database setup error: {e}")
 
-# Initialize database on startup
-initialize_database()
+@click.command('init-db')
+@with_appcontext
+def init_db_command():
+    """Create database tables and the demo user"""
+    initialize_database()
+
+# Conditional GET helpers
+def compute_build_id(app):
+    """Digest of the app version, asset manifest and templates, so a deploy changing any of them changes every ETag"""
+    digest = hashlib.sha1(app.config['APP_VERSION'].encode('utf-8'))
+    digest.update(json.dumps(app.extensions['static_assets']['manifest'], sort_keys=True).encode('utf-8'))
+    for root, _, files in sorted(os.walk(os.path.join(app.root_path, app.template_folder))):
+        for name in sorted(files):
+            with open(os.path.join(root, name), 'rb') as f:
+                digest.update(name.encode('utf-8'))
+                digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+def make_etag(*parts):
+    """Build an ETag from the values that identify one version of a response"""
+    key = ':'.join(str(part) for part in (current_app.config['BUILD_ID'],) + parts)
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+def status_last_modified(updated_at):
+    """Last-Modified for responses that show Itinerary.get_status(), which changes at local midnight"""
+    if updated_at is None:
+        return None
+    today_started = datetime.combine(date.today(), datetime.min.time()).astimezone(timezone.utc)
+    return max(updated_at, today_started.replace(tzinfo=None))
+
+def not_modified_response(etag, last_modified=None):
+    """Return a 304 response if the client's cached copy is current, otherwise None"""
+    if request.if_none_match:
+        # Weak comparison, since compressed responses carry weak ETags
+        is_current = request.if_none_match.contains_weak(etag)
+    elif request.if_modified_since and last_modified:
+        is_current = last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= request.if_modified_since
+    else:
+        is_current = False
+    
+    if not is_current:
+        return None
+    return set_cache_validators(current_app.response_class(status=304), etag, last_modified)
+
+def set_cache_validators(response, etag, last_modified=None):
+    """Attach ETag/Last-Modified and make clients revalidate before reusing the response"""
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified.replace(tzinfo=timezone.utc)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+# Rendered HTML caches
+def render_public_page(template_name):
+    """Render a public page, reusing the HTML for anonymous visitors without pending flashes"""
+    if current_user.is_authenticated or '_flashes' in session or current_app.debug or not page_cache.ttl:
+        return render_template(template_name)
+    
+    html = page_cache.get(template_name)
+    if html is None:
+        html = render_template(template_name)
+        page_cache.set(template_name, html)
+    return html
+
+def render_recent_searches(user_id):
+    """Render the chatbot's recent-searches sidebar, reused while the user's searches are unchanged"""
+    # The version is read from the database, so a search saved or pruned by any worker
+    # changes the key and a stale copy can never match
+    key = ('recent_searches', user_id, tuple(get_search_history_version(user_id)))
+    html = fragment_cache.get(key)
+    if html is None:
+        html = render_template('_recent_searches.html', recent_searches=get_user_search_summaries(user_id, 10))
+        fragment_cache.set(key, html)
+    return Markup(html)
 
 # Routes
-@app.route('/')
+@bp.route('/')
 def index():
     """Landing page"""
-    return render_template('index.html')
+    return render_public_page('index.html')
 
-@app.route('/login', methods=['GET', 'POST'])
+@bp.route('/login', methods=['GET', 'POST'])
 def login():
     """User login"""
     if current_user.is_authenticated:
-        return redirect(url_for('chatbot_page'))
+        return redirect(url_for('main.chatbot_page'))
     
     if request.method == 'POST':
         email = request.form.get('email', '').strip()
@@ -425,6 +459,10 @@ def login():
         user = get_user_by_email(email)
         
         if user and user.check_password(password):
+            # Upgrade hashes made with an older method or work factor while we have the password
+            if passwords.needs_rehash(user.password_hash):
+                user.set_password(password)
+            
             # Update last login time
             user.last_login = datetime.utcnow()
             db.session.commit()
@@ -434,17 +472,17 @@ def login():
             
             # Redirect to next page or chatbot
             next_page = request.args.get('next')
-            return redirect(next_page) if next_page else redirect(url_for('chatbot_page'))
+            return redirect(next_page) if next_page else redirect(url_for('main.chatbot_page'))
         else:
             flash('Invalid email or password.', 'error')
     
     return render_template('login.html')
 
-@app.route('/signup', methods=['GET', 'POST'])
+@bp.route('/signup', methods=['GET', 'POST'])
 def signup():
     """User registration"""
     if current_user.is_authenticated:
-        return redirect(url_for('chatbot_page'))
+        return redirect(url_for('main.chatbot_page'))
     
     if request.method == 'POST':
         name = request.form.get('name', '').strip()
@@ -480,29 +518,29 @@ def signup():
         if user:
             login_user(user)
             flash(f'Welcome to ParadiseRide, {name}!', 'success')
-            return redirect(url_for('chatbot_page'))
+            return redirect(url_for('main.chatbot_page'))
         else:
             flash('An error occurred during registration. Please try again.', 'error')
     
     return render_template('signup.html')
 
-@app.route('/logout')
+@bp.route('/logout')
 @login_required
 def logout():
     """User logout"""
+    invalidate_user_cache(current_user.id)
     logout_user()
     flash('You have been logged out successfully.', 'info')
-    return redirect(url_for('index'))
+    return redirect(url_for('main.index'))
 
-@app.route('/chatbot')
+@bp.route('/chatbot')
 @login_required
 def chatbot_page():
     """Main chatbot interface"""
     # Get recent search history for sidebar
-    recent_searches = current_user.get_recent_searches(10)
-    return render_template('chatbot.html', recent_searches=recent_searches)
+    return render_template('chatbot.html', recent_searches_html=render_recent_searches(current_user.id))
 
-@app.route('/api/chat', methods=['POST'])
+@bp.route('/api/chat', methods=['POST'])
 @login_required
 def api_chat():
     """API endpoint for chatbot interactions"""
@@ -522,7 +560,7 @@ def api_chat():
             user_id=current_user.id,
             mood=detected_mood,
             query=user_message,
-            result=json.dumps(recommendations)
+            result=fast_json.dumps_stored(recommendations)
         )
         
         return jsonify({
@@ -531,10 +569,10 @@ def api_chat():
         })
         
     except Exception as e:
-        app.logger.error(f"Chat API error: {str(e)}")
+        log_event('chat_failed', logging.ERROR, error=str(e))
         return jsonify({'error': 'An error occurred processing your request'}), 500
 
-@app.route('/api/create_itinerary', methods=['POST'])
+@bp.route('/api/create_itinerary', methods=['POST'])
 @login_required
 def api_create_itinerary():
     """API endpoint to create detailed itinerary"""
@@ -545,8 +583,6 @@ def api_create_itinerary():
         start_date_str = data.get('start_date')
         mood_tag = data.get('mood', 'happy')
         
-        app.logger.info(f"Creating itinerary for {destination_name}, duration: {duration}, start: {start_date_str}")
-        
         if not all([destination_name, start_date_str]):
             return jsonify({'error': 'Destination and start date are required'}), 400
         
@@ -560,16 +596,17 @@ def api_create_itinerary():
         
         # Find destination data
         destination_data = None
-        for mood_destinations in MOOD_DESTINATIONS.values():
-            for dest in mood_destinations['destinations']:
-                if dest['name'] == destination_name:
-                    destination_data = dest
+        with tracing.span('catalog.find_destination', destination=destination_name):
+            for mood_destinations in MOOD_DESTINATIONS.values():
+                for dest in mood_destinations['destinations']:
+                    if dest['name'] == destination_name:
+                        destination_data = dest
+                        break
+                if destination_data:
                     break
-            if destination_data:
-                break
         
         if not destination_data:
-            app.logger.error(f"Destination not found: {destination_name}")
+            log_event('itinerary_destination_not_found', logging.ERROR, destination=destination_name)
             return jsonify({'error': f'Destination "{destination_name}" not found'}), 404
         
         # Parse dates
@@ -577,16 +614,12 @@ def api_create_itinerary():
             start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
             end_date = start_date + timedelta(days=duration-1)
         except ValueError as e:
-            app.logger.error(f"Date parsing error: {e}")
+            log_event('itinerary_bad_start_date', logging.ERROR, start_date=start_date_str, error=str(e))
             return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
         
-        app.logger.info(f"Creating detailed itinerary for {destination_name}")
-        
         # Create detailed itinerary
         detailed_itinerary = chatbot.create_itinerary(destination_data, duration)
         
-        app.logger.info(f"Detailed itinerary created successfully. Saving to database...")
-        
         # Save to database
         itinerary = create_itinerary(
             user_id=current_user.id,
@@ -596,11 +629,12 @@ def api_create_itinerary():
             end_date=end_date,
             budget=destination_data['budget'],
             description=destination_data['description'],
-            detailed_plan=json.dumps(detailed_itinerary),
+            detailed_plan=fast_json.dumps_stored(detailed_itinerary),
             mood_tag=mood_tag
         )
         
-        app.logger.info(f"Itinerary saved to database with ID: {itinerary.id}")
+        log_event('itinerary_created', itinerary_id=itinerary.id, destination=destination_name,
+                  days=duration, start_date=start_date_str)
         
         return jsonify({
             'success': True,
@@ -610,10 +644,10 @@ def api_create_itinerary():
         })
         
     except Exception as e:
-        app.logger.error(f"Create itinerary error: {str(e)}", exc_info=True)
+        log_event('itinerary_create_failed', logging.ERROR, exc_info=True, error=str(e))
         return jsonify({'error': f'An error occurred creating the itinerary: {str(e)}'}), 500
 
-@app.route('/dashboard')
+@bp.route('/dashboard')
 @login_required
 def dashboard():
     """User dashboard"""
@@ -623,64 +657,105 @@ def dashboard():
         'member_since': current_user.created_at.strftime('%B %Y')
     }
     
-    recent_searches = current_user.get_recent_searches(5)
-    from models import get_user_itineraries
-    recent_itineraries = get_user_itineraries(current_user.id, 5)
+    recent_searches = get_user_search_summaries(current_user.id, 5)
+    recent_itineraries = get_user_itinerary_summaries(current_user.id, 5)
     
     return render_template('dashboard.html', 
                          stats=user_stats, 
                          recent_searches=recent_searches,
                          recent_itineraries=recent_itineraries)
 
-@app.route('/itinerary/<int:itinerary_id>')
+@bp.route('/itinerary/<int:itinerary_id>')
 @login_required
 def view_itinerary(itinerary_id):
     """View detailed itinerary"""
+    # Pages carrying flashed messages must be rendered so the messages are consumed
+    # The page shows the trip's status, which depends on today's date as well as the row
+    updated_at = get_itinerary_version(itinerary_id, current_user.id)
+    etag = make_etag('itinerary', current_user.id, itinerary_id, updated_at, date.today())
+    if updated_at and '_flashes' not in session:
+        not_modified = not_modified_response(etag, status_last_modified(updated_at))
+        if not_modified:
+            return not_modified
+    
     itinerary = db.session.query(Itinerary).filter_by(id=itinerary_id, user_id=current_user.id).first()
     if not itinerary:
         flash('Itinerary not found.', 'error')
-        return redirect(url_for('dashboard'))
+        return redirect(url_for('main.dashboard'))
     
-    return render_template('itinerary.html', itinerary=itinerary)
+    response = current_app.make_response(render_template('itinerary.html', itinerary=itinerary))
+    return set_cache_validators(response, etag, status_last_modified(itinerary.updated_at))
 
-@app.route('/about')
+@bp.route('/about')
 def about():
     """About page"""
-    return render_template('about.html')
+    return render_public_page('about.html')
 
-@app.route('/team')
+@bp.route('/team')
 def team():
     """Team page"""
-    return render_template('team.html')
+    return render_public_page('team.html')
 
-@app.route('/test-images')
+@bp.route('/test-images')
 def test_images():
     """Test page for debugging team images"""
     return render_template('test_images.html')
 
-@app.route('/api/itineraries')
+@bp.route('/api/itineraries')
 @login_required
 def api_itineraries():
-    """API to get user's itineraries"""
-    from models import get_user_itineraries
-    itineraries = get_user_itineraries(current_user.id)
-    return jsonify({
+    """API to get user's itineraries (summaries unless ?full=1 is given)"""
+    full = request.args.get('full') == '1'
+    count, last_updated = get_itinerary_list_version(current_user.id)
+    # Each itinerary's status depends on today's date as well as the rows
+    last_updated = status_last_modified(last_updated)
+    etag = make_etag('itineraries', current_user.id, full, count, last_updated, date.today())
+    not_modified = not_modified_response(etag, last_updated)
+    if not_modified:
+        return not_modified
+    
+    if full:
+        from models import get_user_itineraries
+        itineraries = [itinerary.to_dict() for itinerary in get_user_itineraries(current_user.id)]
+    else:
+        itineraries = [itinerary.to_summary_dict() for itinerary in get_user_itinerary_summaries(current_user.id)]
+    response = jsonify({
         'success': True,
-        'itineraries': [itinerary.to_dict() for itinerary in itineraries]
+        'itineraries': itineraries
     })
+    return set_cache_validators(response, etag, last_updated)
 
-@app.route('/api/search_history')
+@bp.route('/api/search_history')
 @login_required
 def api_search_history():
     """API to get user's search history"""
+    version = get_search_history_version(current_user.id)
+    etag = make_etag('search_history', current_user.id, *version)
+    # No Last-Modified: pruning, ratings and favorites change the list without a newer timestamp
+    not_modified = not_modified_response(etag)
+    if not_modified:
+        return not_modified
+    
     from models import get_user_search_history
     searches = get_user_search_history(current_user.id)
-    return jsonify({
+    response = jsonify({
         'success': True,
         'searches': [search.to_dict() for search in searches]
     })
+    return set_cache_validators(response, etag)
 
-@app.route('/api/optimize_budget', methods=['POST'])
+@bp.route('/api/analytics/moods')
+@login_required
+def api_mood_analytics():
+    """API for mood trends, answered from the precomputed rollups"""
+    from analytics import get_mood_analytics
+    days = max(1, min(request.args.get('days', 30, type=int), 365))
+    return jsonify({
+        'success': True,
+        **get_mood_analytics(days)
+    })
+
+@bp.route('/api/optimize_budget', methods=['POST'])
 @login_required
 def api_optimize_budget():
     """API endpoint to optimize budget for an itinerary"""
@@ -691,11 +766,10 @@ def api_optimize_budget():
         duration = data.get('duration', 3)
         current_budget = data.get('current_budget', '')
         
-        app.logger.info(f"Optimizing budget for itinerary {itinerary_id}, destination: {destination}")
+        log_event('budget_optimization_requested', itinerary_id=itinerary_id, destination=destination)
         
         # Verify itinerary belongs to user
-        itinerary = db.session.query(Itinerary).filter_by(id=itinerary_id, user_id=current_user.id).first()
-        if not itinerary:
+        if not user_owns_itinerary(itinerary_id, current_user.id):
             return jsonify({'error': 'Itinerary not found'}), 404
         
         # Generate budget optimization suggestions
@@ -707,10 +781,10 @@ def api_optimize_budget():
         })
         
     except Exception as e:
-        app.logger.error(f"Budget optimization error: {str(e)}", exc_info=True)
+        log_event('budget_optimization_failed', logging.ERROR, exc_info=True, error=str(e))
         return jsonify({'error': f'An error occurred optimizing budget: {str(e)}'}), 500
 
-@app.route('/api/apply_optimization', methods=['POST'])
+@bp.route('/api/apply_optimization', methods=['POST'])
 @login_required
 def api_apply_optimization():
     """API endpoint to apply budget optimization to an itinerary"""
@@ -721,15 +795,13 @@ def api_apply_optimization():
         destination = data.get('destination')
         duration = data.get('duration', 3)
         
-        app.logger.info(f"Applying {optimization_level} optimization to itinerary {itinerary_id}")
-        
         # Verify itinerary belongs to user
         itinerary = db.session.query(Itinerary).filter_by(id=itinerary_id, user_id=current_user.id).first()
         if not itinerary:
             return jsonify({'error': 'Itinerary not found'}), 404
         
         # Get current itinerary data
-        current_itinerary = json.loads(itinerary.detailed_plan)
+        current_itinerary = fast_json.loads(itinerary.detailed_plan)
         
         # Apply optimization to create updated itinerary
         optimized_itinerary = apply_budget_optimization_to_itinerary(
@@ -737,9 +809,10 @@ def api_apply_optimization():
         )
         
         # Update the itinerary in database
-        itinerary.detailed_plan = json.dumps(optimized_itinerary)
+        itinerary.detailed_plan = fast_json.dumps_stored(optimized_itinerary)
         itinerary.budget = optimized_itinerary['estimated_budget']
         db.session.commit()
+        log_event('optimization_applied', itinerary_id=itinerary_id, optimization_level=optimization_level)
         
         return jsonify({
             'success': True,
@@ -748,9 +821,10 @@ def api_apply_optimization():
         })
         
     except Exception as e:
-        app.logger.error(f"Apply optimization error: {str(e)}", exc_info=True)
+        log_event('optimization_apply_failed', logging.ERROR, exc_info=True, error=str(e))
         return jsonify({'error': f'An error occurred applying optimization: {str(e)}'}), 500
 
+@tracing.traced('budget.apply_optimization')
 def apply_budget_optimization_to_itinerary(current_itinerary, destination, optimization_level):
     """Apply budget optimization to an existing itinerary"""
     
@@ -775,8 +849,8 @@ def apply_budget_optimization_to_itinerary(current_itinerary, destination, optim
             
     else:  # medium optimization
         # Use budget to mid-range accommodations
-        budget_hotels = hotels.get('budget', [])
-        mid_range_hotels = hotels.get('mid_range', [])
+        budget_hotels = hotels.get('budget', ())
+        mid_range_hotels = hotels.get('mid_range', ())
         available_hotels = budget_hotels + mid_range_hotels
         selected_hotel = random.choice(available_hotels) if available_hotels else "Budget Hotel"
         hotel_type = "Budget/Mid-range Hotel"
@@ -882,6 +956,7 @@ def apply_budget_optimization_to_itinerary(current_itinerary, destination, optim
     
     return current_itinerary
 
+@tracing.traced('budget.generate_optimization')
 def generate_budget_optimization(destination, duration, current_budget):
     """Generate budget optimization suggestions for a destination"""
     
@@ -1039,46 +1114,49 @@ def generate_budget_optimization(destination, duration, current_budget):
     }
 
 # Error handlers
-@app.errorhandler(404)
+@bp.app_errorhandler(404)
 def not_found_error(error):
     return render_template('404.html'), 404
 
-@app.errorhandler(500)
+@bp.app_errorhandler(500)
 def internal_error(error):
     db.session.rollback()
     return render_template('500.html'), 500
 
 # Context processors
-@app.context_processor
+@bp.app_context_processor
 def inject_user():
     """Make current user available in all templates"""
     return dict(current_user=current_user)
 
-@app.context_processor
+@bp.app_context_processor
 def inject_config():
     """Make config available in templates"""
-    return dict(app_name=app.config['APP_NAME'])
+    return dict(app_name=current_app.config['APP_NAME'])
 
 # Template filters
-@app.template_filter('datetime')
+@bp.app_template_filter('datetime')
 def datetime_filter(datetime_obj):
     """Format datetime for display"""
     return datetime_obj.strftime('%B %d, %Y at %I:%M %p')
 
-@app.template_filter('date')
+@bp.app_template_filter('date')
 def date_filter(date_obj):
     """Format date for display"""
     return date_obj.strftime('%B %d, %Y')
 
-@app.template_filter('from_json')
+@bp.app_template_filter('from_json')
 def from_json_filter(json_str):
     """Parse JSON string in templates"""
     try:
-        return json.loads(json_str) if json_str else {}
+        return fast_json.loads(json_str) if json_str else {}
     except:
         return {}
 
 if __name__ == '__main__':
+    app = create_app()
+    with app.app_context():
+        initialize_database()
     print(f"Starting {app.config['APP_NAME']}...")
     print("Visit: http://127.0.0.1:5000")
     print("📧 Demo login: demo@paradiseride.com")
@@ -0,0 +1,76 @@
+"""
+Background writer threads for AI Travel Chatbot
+Log records (structured_logging.py) and finished traces (tracing.py) are put
+on a bounded queue and written by a daemon thread, so request threads never
+wait on I/O; when the queue is full the item is refused instead of blocking.
+
+The thread is started on first use in each process, so it also runs in
+workers forked from a preloaded gunicorn master. One exit hook, registered
+once per process however many apps are created, flushes the writers running
+in it.
+"""
+
+import atexit
+import os
+import queue
+import threading
+import weakref
+
+_running = weakref.WeakSet()
+
+
+class BackgroundWriter:
+    """Bounded queue drained by a per-process daemon thread; subclasses implement drain()"""
+
+    thread_name = 'background-writer'
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.queue = queue.Queue(maxsize)
+        self.thread = None
+        self.thread_pid = None
+        self._start_lock = threading.Lock()
+
+    def put(self, item):
+        """Queue an item without waiting; return False if the queue is full"""
+        if self.thread_pid != os.getpid():
+            self.start()
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            return False
+        return True
+
+    def start(self):
+        with self._start_lock:
+            if self.thread_pid == os.getpid():
+                return
+            if self.thread_pid is not None:
+                # A forked child inherits the queue but not the writer thread
+                self.queue = queue.Queue(self.maxsize)
+            self.thread = threading.Thread(target=self.drain, args=(self.queue,), name=self.thread_name,
+                                           daemon=True)
+            self.thread.start()
+            self.thread_pid = os.getpid()
+            _running.add(self)
+
+    def stop(self):
+        """Write everything queued and stop the thread"""
+        with self._start_lock:
+            # Only the process that started the thread can join it
+            if self.thread is not None and self.thread_pid == os.getpid():
+                self.queue.put(None)
+                self.thread.join()
+            self.thread = None
+            self.thread_pid = None
+            _running.discard(self)
+
+    def drain(self, pending):
+        """Write items taken from pending until it yields None"""
+        raise NotImplementedError
+
+
+@atexit.register
+def _stop_running_writers():
+    for writer in list(_running):
+        writer.stop()
@@ -0,0 +1,39 @@
+"""
+Helpers shared by the benchmark scripts
+Imported as a sibling module, since the scripts are run directly
+(python benchmarks/<script>.py).
+"""
+
+# Chat messages spanning every mood, plus a few that match none
+MESSAGES = [
+    "I'm so stressed with work, I need a break somewhere quiet",
+    "Feeling adventurous! Looking for trekking and mountains",
+    "Planning a romantic getaway for our anniversary",
+    "I want beaches and parties with friends this weekend",
+    "Just want to relax by the water and read a book",
+    "We're excited to explore some new culture and food",
+    "Need peace and yoga, maybe near a river",
+    "Celebrating a promotion, want somewhere fun and lively",
+    "honeymoon ideas? somewhere beautiful and private",
+    "burnt out after exams, need to recharge",
+    "looking for a thrilling trip, paragliding or rafting",
+    "happy",
+    "calm",
+    "My parents want a peaceful holiday with nice weather",
+    "I'm bored and want something exciting to do in December",
+    "Suggest a cozy hill station for a couple",
+    "Anxious lately, want nature and fresh air",
+    "road trip with the gang, party vibes!!",
+    "Want to see palaces, forts and local markets",
+    "snow, camping and stargazing in the himalayas",
+    "A quiet place to meditate for a week",
+    "Somewhere with great street food and nightlife",
+    "I'm feeling sad and want to get away from everything",
+    "candlelight dinners and lake views"
+]
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
@@ -0,0 +1,189 @@
+"""
+End-to-end load test for AI Travel Chatbot
+Runs concurrent virtual users through the main journey against a throwaway
+SQLite database, using Flask's test client. Each user signs up once, then for
+every iteration logs in, chats with the bot, creates an itinerary from the
+first recommended destination, opens the dashboard and the itinerary, asks for
+budget tips, applies an optimization and logs out.
+
+Reports throughput and p50/p95/p99 latency per step. Runs are seeded, and
+--json saves the results so numbers from before and after a change can be
+compared.
+
+Usage:
+    python benchmarks/load_test.py [--users 8] [--iterations 5] [--chats 3] [--json results.json]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from config import MOOD_DESTINATIONS
+from models import db
+
+from common import MESSAGES, percentile
+
+PASSWORD = 'load-test-password'
+STEPS = ['signup', 'login', 'chat', 'create_itinerary', 'dashboard', 'view_itinerary',
+         'optimize_budget', 'apply_optimization', 'logout']
+
+
+class VirtualUser:
+    """One simulated visitor with its own cookie jar and random stream"""
+
+    def __init__(self, app, index, seed, timings, errors):
+        self.client = app.test_client()
+        self.email = f"loaduser{index}@example.com"
+        self.random = random.Random(seed + index)
+        self.timings = timings
+        self.errors = errors
+
+    def step(self, name, method, path, expected=(200,), **kwargs):
+        started = time.perf_counter()
+        response = getattr(self.client, method)(path, **kwargs)
+        elapsed = time.perf_counter() - started
+        self.timings[name].append(elapsed)
+        if response.status_code not in expected:
+            self.errors[name] += 1
+            return None
+        return response
+
+    def run(self, iterations, chats):
+        self.step('signup', 'post', '/signup', expected=(302,), data={
+            'name': 'Load User', 'email': self.email, 'password': PASSWORD, 'confirm_password': PASSWORD
+        })
+        self.step('logout', 'get', '/logout', expected=(302,))
+
+        for _ in range(iterations):
+            if not self.step('login', 'post', '/login', expected=(302,),
+                             data={'email': self.email, 'password': PASSWORD}):
+                continue
+
+            destination = None
+            for _ in range(chats):
+                response = self.step('chat', 'post', '/api/chat',
+                                     json={'message': self.random.choice(MESSAGES)})
+                recommended = response.get_json()['response'].get('destinations') if response else None
+                if recommended:
+                    destination = recommended[0]
+            if destination is None:
+                mood = self.random.choice(list(MOOD_DESTINATIONS))
+                destination = MOOD_DESTINATIONS[mood]['destinations'][0]
+
+            duration = self.random.randint(2, 7)
+            response = self.step('create_itinerary', 'post', '/api/create_itinerary', json={
+                'destination': destination['name'], 'duration': duration, 'start_date': '2026-12-01'
+            })
+            self.step('dashboard', 'get', '/dashboard')
+            if response is not None:
+                itinerary_id = response.get_json()['itinerary_id']
+                self.step('view_itinerary', 'get', f'/itinerary/{itinerary_id}')
+                self.step('optimize_budget', 'post', '/api/optimize_budget', json={
+                    'itinerary_id': itinerary_id, 'destination': destination['name'], 'duration': duration,
+                    'current_budget': destination.get('budget', '')
+                })
+                self.step('apply_optimization', 'post', '/api/apply_optimization', json={
+                    'itinerary_id': itinerary_id, 'destination': destination['name'], 'duration': duration,
+                    'optimization_level': self.random.choice(['medium', 'high'])
+                })
+            self.step('logout', 'get', '/logout', expected=(302,))
+
+
+def run(users, iterations, chats, seed, overrides, tmp):
+    """Run the journey with concurrent virtual users; returns per-step results"""
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp, 'load.db')}",
+        'RATELIMIT_ENABLED': False,
+        'MAX_CONCURRENT_REQUESTS': 0,
+        'PROFILE_SAMPLE_RATE': 0,
+        'TRACE_EXPORTER': 'none',
+        **overrides
+    })
+    with app.app_context():
+        db.create_all()
+    # Warm templates, caches and the hashing pool outside the timed run
+    VirtualUser(app, users, seed, defaultdict(list), defaultdict(int)).run(1, 1)
+
+    timings, errors = defaultdict(list), defaultdict(int)
+    barrier = threading.Barrier(users + 1)
+
+    def visit(index):
+        user = VirtualUser(app, index, seed, timings, errors)
+        barrier.wait()
+        user.run(iterations, chats)
+
+    threads = [threading.Thread(target=visit, args=(i,)) for i in range(users)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    steps = {}
+    for name in STEPS:
+        values = timings.get(name)
+        if not values:
+            continue
+        steps[name] = {
+            'requests': len(values),
+            'errors': errors.get(name, 0),
+            'p50_ms': percentile(values, 50) * 1000,
+            'p95_ms': percentile(values, 95) * 1000,
+            'p99_ms': percentile(values, 99) * 1000
+        }
+    total = sum(step['requests'] for step in steps.values())
+    return {
+        'users': users,
+        'iterations': iterations,
+        'chats': chats,
+        'seed': seed,
+        'elapsed_s': elapsed,
+        'requests': total,
+        'requests_per_sec': total / elapsed,
+        'journeys_per_sec': users * iterations / elapsed,
+        'steps': steps
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the main user journey')
+    parser.add_argument('--users', type=int, default=8, help='Concurrent virtual users')
+    parser.add_argument('--iterations', type=int, default=5, help='Journeys per user after signing up')
+    parser.add_argument('--chats', type=int, default=3, help='Chat messages per journey')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed for messages and trip lengths')
+    parser.add_argument('--hash-method', default=None,
+                        help='Password hash method, e.g. pbkdf2:sha256:1000 to keep hashing out of the numbers')
+    parser.add_argument('--json', dest='json_path', help='Also write the results to this JSON file')
+    args = parser.parse_args()
+
+    overrides = {'PASSWORD_HASH_METHOD': args.hash_method} if args.hash_method else {}
+    print(f"🚦 {args.users} users x {args.iterations} journeys ({args.chats} chats each), seed {args.seed}")
+    with tempfile.TemporaryDirectory() as tmp:
+        result = run(args.users, args.iterations, args.chats, args.seed, overrides, tmp)
+
+    print(f"{'Step':<20}{'Requests':>9}{'Errors':>8}{'p50':>9}{'p95':>9}{'p99':>9}  (ms)")
+    for name, step in result['steps'].items():
+        print(f"{name:<20}{step['requests']:>9}{step['errors']:>8}"
+              f"{step['p50_ms']:>9.1f}{step['p95_ms']:>9.1f}{step['p99_ms']:>9.1f}")
+    print(f"✅ {result['requests']} requests in {result['elapsed_s']:.1f} s: "
+          f"{result['requests_per_sec']:.1f} req/s, {result['journeys_per_sec']:.2f} journeys/s")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+        print(f"📝 Results written to {args.json_path}")
+
+
+if __name__ == '__main__':
+    main()
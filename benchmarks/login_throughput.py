@@ -0,0 +1,117 @@
+"""
+Login throughput benchmark for AI Travel Chatbot
+Fires concurrent logins at a throwaway database while one thread keeps
+requesting a cheap page. It reports login throughput and latency, and how
+much the login burst slows that other traffic, for each hashing pool size
+(0 = hash on the request thread).
+
+Usage:
+    python benchmarks/login_throughput.py [--logins 200] [--threads 8] [--workers 0,2,4]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from models import db, create_user
+
+from common import percentile
+
+PASSWORD = 'benchmark-password'
+
+
+def run(workers, logins, threads, users, method, tmp):
+    """Benchmark one pool size; returns a dict of results"""
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp, f'login-{workers}.db')}",
+        'PASSWORD_HASH_METHOD': method,
+        'PASSWORD_HASH_WORKERS': workers,
+        'RATELIMIT_ENABLED': False,
+        'MAX_CONCURRENT_REQUESTS': 0,
+        'PAGE_CACHE_TTL': 0
+    })
+    with app.app_context():
+        db.create_all()
+        for i in range(users):
+            create_user(f"User {i}", f"user{i}@example.com", PASSWORD)
+
+    # Warm the pool and the page before timing
+    app.test_client().post('/login', data={'email': 'user0@example.com', 'password': PASSWORD})
+    app.test_client().get('/about')
+
+    login_times, page_times = [], []
+    remaining = iter(range(logins))
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def log_in():
+        while True:
+            with lock:
+                i = next(remaining, None)
+            if i is None:
+                return
+            started = time.perf_counter()
+            response = app.test_client().post('/login', data={'email': f"user{i % users}@example.com",
+                                                              'password': PASSWORD})
+            assert response.status_code == 302, response.status_code
+            login_times.append(time.perf_counter() - started)
+
+    def browse():
+        client = app.test_client()
+        while not done.is_set():
+            started = time.perf_counter()
+            client.get('/about')
+            page_times.append(time.perf_counter() - started)
+
+    browser = threading.Thread(target=browse)
+    browser.start()
+    started = time.perf_counter()
+    pool = [threading.Thread(target=log_in) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    done.set()
+    browser.join()
+
+    return {
+        'workers': workers,
+        'logins_per_sec': logins / elapsed,
+        'login_p50': statistics.median(login_times) * 1000,
+        'login_p95': percentile(login_times, 95) * 1000,
+        'page_p50': statistics.median(page_times) * 1000,
+        'page_p95': percentile(page_times, 95) * 1000
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure login throughput per hashing pool size')
+    parser.add_argument('--logins', type=int, default=200, help='Total logins per run')
+    parser.add_argument('--threads', type=int, default=8, help='Concurrent login threads')
+    parser.add_argument('--users', type=int, default=20, help='Accounts to log in as')
+    parser.add_argument('--workers', default='0,2,4', help='Comma-separated hashing pool sizes to compare')
+    parser.add_argument('--method', default=None, help='Hash method (defaults to Config.PASSWORD_HASH_METHOD)')
+    args = parser.parse_args()
+
+    from config import Config
+    method = args.method or Config.PASSWORD_HASH_METHOD
+
+    print(f"🔐 {args.logins} logins from {args.threads} threads using {method}")
+    print(f"{'Workers':>8}{'Logins/s':>10}{'Login p50':>11}{'Login p95':>11}{'Page p50':>10}{'Page p95':>10}  (ms)")
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in [int(value) for value in args.workers.split(',')]:
+            result = run(workers, args.logins, args.threads, args.users, method, tmp)
+            print(f"{result['workers']:>8}{result['logins_per_sec']:>10.1f}{result['login_p50']:>11.1f}"
+                  f"{result['login_p95']:>11.1f}{result['page_p50']:>10.1f}{result['page_p95']:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
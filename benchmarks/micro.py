@@ -0,0 +1,241 @@
+"""
+Micro-benchmarks for AI Travel Chatbot's core engines
+Times mood detection, recommendations, itinerary generation (1-30 days),
+budget optimization and the model serializers in isolation, saves the results
+as a JSON baseline, and compares a later run against it. compare exits with
+status 1 when any benchmark got slower than the threshold allows, or is in the
+baseline but missing from the current results, so it can gate CI. Baselines
+only compare meaningfully on the same machine.
+
+Each benchmark reports the fastest of several rounds (the least noisy figure)
+and the median, per call. A slowdown also has to exceed an absolute floor
+(--min-delta, in µs) to count, since a few hundred nanoseconds of jitter is
+already 15% of the fastest benchmarks.
+
+Usage:
+    python benchmarks/micro.py run [--save benchmarks/baselines/local.json] [--only itinerary]
+    python benchmarks/micro.py compare benchmarks/baselines/local.json [--threshold 0.15] [--min-delta 1.0]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import timeit
+from datetime import date, datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fast_json
+from app import (apply_budget_optimization_to_itinerary, chatbot, create_app,
+                 generate_budget_optimization)
+from config import MOOD_DESTINATIONS
+from models import db, create_user, create_itinerary, save_search_history, Itinerary, SearchHistory
+
+from common import MESSAGES
+
+DURATIONS = [1, 3, 7, 14, 30]
+DESTINATION = MOOD_DESTINATIONS['excited']['destinations'][1]
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """Register a benchmark; the decorated function returns the callable to time"""
+    def register(factory):
+        BENCHMARKS[name] = factory
+        return factory
+    return register
+
+
+@benchmark(f'detect_mood ({len(MESSAGES)} messages)')
+def bench_detect_mood(context):
+    return lambda: [chatbot.detect_mood(message) for message in MESSAGES]
+
+
+@benchmark(f'get_recommendations ({len(MESSAGES)} messages)')
+def bench_get_recommendations(context):
+    moods = [(chatbot.detect_mood(message), message) for message in MESSAGES]
+    return lambda: [chatbot.get_recommendations(mood, message) for mood, message in moods]
+
+
+for _days in DURATIONS:
+    @benchmark(f'create_itinerary ({_days} days)')
+    def bench_create_itinerary(context, days=_days):
+        return lambda: chatbot.create_itinerary(DESTINATION, days)
+
+
+@benchmark('generate_budget_optimization')
+def bench_generate_budget_optimization(context):
+    return lambda: generate_budget_optimization(DESTINATION['name'], 7, DESTINATION['budget'])
+
+
+for _level in ['medium', 'high']:
+    @benchmark(f'apply_budget_optimization_to_itinerary ({_level}, 7 days)')
+    def bench_apply_budget_optimization(context, level=_level):
+        # Works on a freshly parsed plan each call, as the apply_optimization view does
+        stored = context['stored_plan']
+        return lambda: apply_budget_optimization_to_itinerary(fast_json.loads(stored), DESTINATION['name'],
+                                                              level)
+
+
+@benchmark('User.to_dict')
+def bench_user_to_dict(context):
+    return context['user'].to_dict
+
+
+@benchmark('SearchHistory.to_dict')
+def bench_search_to_dict(context):
+    return context['search'].to_dict
+
+
+@benchmark('Itinerary.to_dict')
+def bench_itinerary_to_dict(context):
+    return context['itinerary'].to_dict
+
+
+@benchmark('Itinerary.get_detailed_plan_dict (cached)')
+def bench_detailed_plan_cached(context):
+    return context['itinerary'].get_detailed_plan_dict
+
+
+@benchmark('Itinerary.get_detailed_plan_dict (parse)')
+def bench_detailed_plan_parse(context):
+    return context['itinerary']._parse_detailed_plan
+
+
+def measure(func, rounds=9):
+    """Per-call time of func in microseconds: fastest and median of several rounds"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    times = [total / number * 1e6 for total in timer.repeat(rounds, number)]
+    return {'min_us': min(times), 'median_us': statistics.median(times), 'calls': number * rounds}
+
+
+def build_context(tmp):
+    """Throwaway database with one user, a few searches and a 7-day itinerary"""
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp, 'micro.db')}",
+                      'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1000', 'LOG_LEVEL': 'WARNING'})
+    ctx = app.app_context()
+    ctx.push()
+    db.create_all()
+    user = create_user('Bench User', 'bench@example.com', 'benchmark')
+    for message in MESSAGES[:5]:
+        mood = chatbot.detect_mood(message)
+        result = chatbot.get_recommendations(mood, message)
+        save_search_history(user.id, mood, message, fast_json.dumps_stored(result))
+    plan = chatbot.create_itinerary(DESTINATION, 7)
+    create_itinerary(user_id=user.id, title='7 Days', destination=DESTINATION['name'],
+                     start_date=date(2026, 12, 1), end_date=date(2026, 12, 7), budget=DESTINATION['budget'],
+                     description=DESTINATION['description'], detailed_plan=fast_json.dumps_stored(plan),
+                     mood_tag='excited')
+    return ctx, {
+        'user': user,
+        'search': db.session.query(SearchHistory).filter_by(user_id=user.id).first(),
+        'itinerary': db.session.query(Itinerary).filter_by(user_id=user.id).first(),
+        'stored_plan': fast_json.dumps_stored(plan)
+    }
+
+
+def run(only=None):
+    """Run the (matching) benchmarks and return a results document"""
+    random.seed(0)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx, context = build_context(tmp)
+        try:
+            for name, factory in BENCHMARKS.items():
+                if only and only.lower() not in name.lower():
+                    continue
+                results[name] = measure(factory(context))
+                print(f"  {name:<58}{results[name]['min_us']:>12.1f}{results[name]['median_us']:>12.1f}")
+        finally:
+            db.session.remove()
+            db.engine.dispose()
+            ctx.pop()
+    return {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.platform(),
+        'results': results
+    }
+
+
+def compare(baseline, current, threshold, min_delta=0.0, only=None):
+    """Print old vs new per benchmark; return (names that regressed beyond threshold, names missing now)"""
+    regressions = []
+    print(f"{'Benchmark':<58}{'Baseline':>12}{'Current':>12}{'Change':>9}")
+    for name, result in current['results'].items():
+        before = baseline['results'].get(name)
+        if before is None:
+            print(f"{name:<58}{'-':>12}{result['min_us']:>12.1f}{'new':>9}")
+            continue
+        change = result['min_us'] / before['min_us'] - 1
+        flag = ''
+        if change > threshold and result['min_us'] - before['min_us'] > min_delta:
+            regressions.append(name)
+            flag = '  ❌'
+        print(f"{name:<58}{before['min_us']:>12.1f}{result['min_us']:>12.1f}{change:>+9.1%}{flag}")
+
+    # A renamed or deleted benchmark would otherwise just stop being checked
+    missing = [name for name in baseline['results']
+               if name not in current['results'] and (not only or only.lower() in name.lower())]
+    for name in missing:
+        print(f"{name:<58}{baseline['results'][name]['min_us']:>12.1f}{'-':>12}{'missing':>9}  ❌")
+    return regressions, missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmarks with JSON baselines')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help='Run the benchmarks')
+    run_parser.add_argument('--save', help='Write the results to this JSON file (a baseline)')
+    run_parser.add_argument('--only', help='Only run benchmarks whose name contains this text')
+    compare_parser = commands.add_parser('compare', help='Compare against a baseline; exit 1 on regression')
+    compare_parser.add_argument('baseline', help='Baseline JSON written by run --save')
+    compare_parser.add_argument('current', nargs='?', help='Results to check (default: run the benchmarks now)')
+    compare_parser.add_argument('--threshold', type=float, default=0.15,
+                                help='Allowed slowdown as a fraction (default 0.15 = 15%%)')
+    compare_parser.add_argument('--min-delta', type=float, default=1.0,
+                                help='Smallest slowdown in µs per call that counts (default 1.0)')
+    compare_parser.add_argument('--only', help='Only run benchmarks whose name contains this text')
+    args = parser.parse_args()
+
+    if args.command == 'compare':
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    if args.command == 'run' or not args.current:
+        print("⏱️ Running micro-benchmarks (µs per call)")
+        print(f"  {'Benchmark':<58}{'Fastest':>12}{'Median':>12}")
+        current = run(args.only)
+    else:
+        with open(args.current, encoding='utf-8') as f:
+            current = json.load(f)
+
+    if args.command == 'run':
+        if args.save:
+            os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+            with open(args.save, 'w', encoding='utf-8') as f:
+                json.dump(current, f, indent=2)
+            print(f"📝 Baseline written to {args.save}")
+        return 0
+
+    regressions, missing = compare(baseline, current, args.threshold, args.min_delta, args.only)
+    if regressions:
+        print(f"❌ {len(regressions)} benchmark(s) slower than the baseline by more than {args.threshold:.0%} "
+              f"and {args.min_delta:g} µs")
+    if missing:
+        print(f"❌ {len(missing)} baseline benchmark(s) missing from the current results; "
+              f"record a new baseline if they were renamed or removed")
+    if regressions or missing:
+        return 1
+    print(f"✅ No regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""
+Startup benchmark for AI Travel Chatbot
+Measures, in fresh interpreter processes, how long it takes to import the
+app module, build the app with create_app() and answer the first request -
+roughly what every new worker pays before it can serve traffic.
+
+Usage:
+    python benchmarks/startup.py [--runs 5] [--path /about]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs inside each child process; prints the phase timings as JSON
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+app = create_app()
+created = time.perf_counter()
+response = app.test_client().get(sys.argv[1])
+answered = time.perf_counter()
+assert response.status_code < 400, response.status_code
+print(json.dumps({
+    'import': (imported - started) * 1000,
+    'create_app': (created - imported) * 1000,
+    'first_request': (answered - created) * 1000,
+    'total': (answered - started) * 1000
+}))
+"""
+
+PHASES = ['import', 'create_app', 'first_request', 'total']
+
+
+def run_once(path, env):
+    """Start a fresh interpreter and return its phase timings in milliseconds"""
+    output = subprocess.run([sys.executable, '-c', CHILD, path], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure import-to-first-request time')
+    parser.add_argument('--runs', type=int, default=5, help='Fresh processes to start')
+    parser.add_argument('--path', default='/about', help='URL requested once the app is built')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # A throwaway database, so the benchmark never touches instance/
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'startup.db')}")
+        runs = [run_once(args.path, env) for _ in range(args.runs)]
+
+    print(f"⏱️  Startup over {args.runs} fresh processes (GET {args.path})")
+    print(f"{'Phase':<16}{'Median (ms)':>14}{'Min (ms)':>12}{'Max (ms)':>12}")
+    for phase in PHASES:
+        values = [run[phase] for run in runs]
+        print(f"{phase:<16}{statistics.median(values):>14.1f}{min(values):>12.1f}{max(values):>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Static asset build step for AI Travel Chatbot
+Writes resized AVIF/WebP/JPEG variants of the images used by responsive_image()
+(if Pillow is installed), precompressed .gz (and .br, if the brotli package is
+installed) copies of compressible files under static/ so they can be served
+without compressing on every request, and the manifest of content-hashed asset
+names used by asset_url(). Run it after changing anything in static/.
+
+Usage:
+    python build_assets.py
+"""
+
+import json
+import mimetypes
+import os
+
+from config import Config
+from compression import ENCODING_SUFFIXES, available_encodings, compress
+from images import Image, build_image_variants
+from static_assets import build_manifest
+
+STATIC_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+
+
+def iter_static_files(static_folder=STATIC_FOLDER):
+    """Yield paths of original files under static/, relative to it"""
+    for root, _, files in os.walk(static_folder):
+        for name in sorted(files):
+            if name.endswith(tuple(ENCODING_SUFFIXES.values())) or name == Config.ASSET_MANIFEST:
+                continue
+            yield os.path.relpath(os.path.join(root, name), static_folder).replace(os.sep, '/')
+
+
+def precompress_static(static_folder=STATIC_FOLDER, level=9):
+    """Write compressed copies of compressible static files, skipping ones that are up to date"""
+    compressible = set(Config.COMPRESS_MIMETYPES)
+    written = []
+
+    for filename in iter_static_files(static_folder):
+        if mimetypes.guess_type(filename)[0] not in compressible:
+            continue
+
+        source = os.path.join(static_folder, filename)
+        source_mtime = os.stat(source).st_mtime
+        with open(source, 'rb') as f:
+            data = None
+            for encoding in available_encodings():
+                target = source + ENCODING_SUFFIXES[encoding]
+                if os.path.exists(target) and os.stat(target).st_mtime >= source_mtime:
+                    continue
+                data = data if data is not None else f.read()
+                compressed = compress(data, encoding, level)
+                if len(compressed) >= len(data):
+                    continue
+                with open(target, 'wb') as out:
+                    out.write(compressed)
+                written.append((filename, encoding, len(data), len(compressed)))
+
+    return written
+
+
+def write_image_manifest(static_folder=STATIC_FOLDER):
+    """Build image variants and write the image manifest next to the static files"""
+    manifest = build_image_variants(static_folder, Config.IMAGE_SOURCE_DIRS, Config.IMAGE_WIDTHS,
+                                    Config.IMAGE_FORMATS, Config.IMAGE_QUALITY)
+    with open(os.path.join(static_folder, Config.IMAGE_MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def write_manifest(static_folder=STATIC_FOLDER):
+    """Write the fingerprint manifest next to the static files"""
+    manifest = build_manifest(static_folder, Config.ASSET_MANIFEST)
+    with open(os.path.join(static_folder, Config.ASSET_MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+if __name__ == '__main__':
+    if Image is None:
+        print("⚠️ Pillow is not installed; skipping responsive image variants")
+    else:
+        print("🖼️ Building responsive image variants...")
+        for filename, entry in write_image_manifest().items():
+            original_size = os.path.getsize(os.path.join(STATIC_FOLDER, filename))
+            for fmt, variants in entry['variants'].items():
+                sizes = ', '.join(f"{width}w {os.path.getsize(os.path.join(STATIC_FOLDER, name)):,}"
+                                  for width, name in variants)
+                print(f"  {filename} ({original_size:,} bytes) [{fmt}] {sizes}")
+    
+    print("📦 Precompressing static assets...")
+    for filename, encoding, original_size, compressed_size in precompress_static():
+        print(f"  {filename} [{encoding}] {original_size:,} → {compressed_size:,} bytes")
+    
+    manifest = write_manifest()
+    print(f"🔖 Fingerprinted {len(manifest)} files into static/{Config.ASSET_MANIFEST}")
+    print("✅ Static assets ready!")
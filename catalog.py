@@ -0,0 +1,177 @@
+"""
+Travel catalog for AI Travel Chatbot
+The mood lexicon and the hotel/restaurant tables, built once at import time
+as module constants instead of on every chatbot call. Lists are frozen into
+tuples so the catalog is immutable.
+
+Under gunicorn with preload_app (see gunicorn.conf.py) the catalog is built
+in the master process. freeze_heap() then moves it and everything else
+loaded so far into the GC's permanent generation just before each fork, so
+workers do not write to those pages when the collector runs and keep
+sharing them copy-on-write. memory_usage() reports what each worker
+actually holds.
+"""
+
+import gc
+import os
+
+
+def freeze(obj):
+    """Recursively turn lists into tuples so catalog data can't be mutated"""
+    if isinstance(obj, dict):
+        return {key: freeze(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return tuple(freeze(value) for value in obj)
+    return obj
+
+
+def freeze_heap():
+    """Collect, then exempt every live object from future GC passes (call in the master before fork)"""
+    gc.collect()
+    gc.freeze()
+    return gc.get_freeze_count()
+
+
+def memory_usage(pid='self'):
+    """Memory of a process in kB: rss plus, on Linux, how much of it is shared vs private"""
+    usage = {}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                field, _, value = line.partition(':')
+                usage[field] = int(value.split()[0])
+        return {
+            'rss': usage.get('Rss', 0),
+            'shared': usage.get('Shared_Clean', 0) + usage.get('Shared_Dirty', 0),
+            'private': usage.get('Private_Clean', 0) + usage.get('Private_Dirty', 0)
+        }
+    except (OSError, ValueError):
+        import resource
+        # Peak RSS only; ru_maxrss is in kB on Linux and bytes on macOS
+        return {'rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}
+
+
+# Keywords that signal each mood in a user's message
+MOOD_KEYWORDS = freeze({
+    'calm': ['calm', 'peaceful', 'serene', 'quiet', 'tranquil', 'relaxed', 'zen', 'meditate', 
+            'peace', 'still', 'silence', 'soothing', 'gentle', 'soft', 'restful', 'mindful'],
+    'excited': ['excited', 'energetic', 'party', 'fun', 'adventure', 'wild', 'crazy', 'lively',
+               'thrilled', 'enthusiastic', 'pumped', 'hyper', 'upbeat', 'dynamic', 'spirited'],
+    'romantic': ['romantic', 'love', 'couple', 'honeymoon', 'intimate', 'cozy', 'date',
+                'partner', 'relationship', 'valentine', 'anniversary', 'together', 'romantic getaway'],
+    'adventurous': ['adventurous', 'thrill', 'extreme', 'hiking', 'trekking', 'adrenaline', 'challenge',
+                   'daring', 'bold', 'brave', 'explore', 'discover', 'expedition', 'wilderness'],
+    'stressed': ['stressed', 'tired', 'exhausted', 'overwhelmed', 'need break', 'burnout', 'pressure',
+                'anxiety', 'tension', 'worried', 'hectic', 'busy', 'overworked', 'mental health'],
+    'happy': ['happy', 'joyful', 'cheerful', 'celebrate', 'vibrant', 'colorful', 'festive',
+             'elated', 'delighted', 'content', 'pleased', 'optimistic', 'positive', 'good mood']
+})
+
+# Common phrases that add weight to a mood
+MOOD_PHRASES = freeze({
+    'stressed': ['need a break', 'feeling overwhelmed', 'work stress', 'too much pressure'],
+    'calm': ['want peace', 'need quiet', 'seek tranquility', 'peaceful place'],
+    'excited': ['want fun', 'party time', 'full of energy', 'ready to explore'],
+    'romantic': ['with partner', 'date night', 'romantic getaway', 'couple trip'],
+    'adventurous': ['want adventure', 'thrill seeking', 'extreme sports', 'mountain climbing'],
+    'happy': ['feeling good', 'want to celebrate', 'in good mood', 'cheerful']
+})
+
+# Hotel recommendations by destination
+HOTEL_RECOMMENDATIONS = freeze({
+    'Goa': {
+        'luxury': ['Taj Exotica Resort & Spa', 'The Leela Goa', 'Grand Hyatt Goa'],
+        'mid_range': ['Novotel Goa Resort & Spa', 'Holiday Inn Resort Goa', 'Radisson Blu Resort Goa'],
+        'budget': ['OYO Hotels Goa', 'Zostel Goa', 'Backpacker Panda Goa']
+    },
+    'Kerala': {
+        'luxury': ['Kumarakom Lake Resort', 'Taj Green Cove Resort & Spa', 'The Leela Kovalam'],
+        'mid_range': ['Fragrant Nature Backwater Resort', 'Spice Village CGH Earth', 'Casino Hotel Kochi'],
+        'budget': ['Kochi Backpackers', 'Zostel Vashisht', 'Green Woods Bethlehem']
+    },
+    'Rajasthan': {
+        'luxury': ['Taj Lake Palace Udaipur', 'The Oberoi Udaivilas', 'Rambagh Palace Jaipur'],
+        'mid_range': ['Hotel Haveli Inn Pal', 'Umaid Bhawan Palace', 'Tree of Life Resort & Spa'],
+        'budget': ['Zostel Jaipur', 'Moustache Hostel Jaipur', 'Backpacker Panda Jaipur']
+    },
+    'Himachal Pradesh': {
+        'luxury': ['The Oberoi Cecil Shimla', 'Wildflower Hall Shimla', 'Fortune Park Dalhousie'],
+        'mid_range': ['Hotel Snow Valley Resorts', 'Apple Country Resort Manali', 'Hotel Hilltop Shimla'],
+        'budget': ['Zostel Manali', 'Backpacker Panda Kasol', 'The Hosteller Manali']
+    },
+    'Karnataka': {
+        'luxury': ['Taj West End Bangalore', 'The Serai Bandipur', 'Evolve Back Coorg'],
+        'mid_range': ['Club Mahindra Coorg', 'Hotel Mayura Hoysala', 'The Gateway Hotel KR Road'],
+        'budget': ['Zostel Bangalore', 'Backpacker Panda Hampi', 'Gokarna International Beach Resort']
+    },
+    'Maharashtra': {
+        'luxury': ['The Taj Mahal Palace Mumbai', 'JW Marriott Mumbai', 'The St. Regis Mumbai'],
+        'mid_range': ['Hotel Sahyadri Pune', 'Lemon Tree Hotel Mumbai', 'The Pride Hotel Pune'],
+        'budget': ['Zostel Mumbai', 'Backpacker Panda Lonavala', 'YMCA Mumbai']
+    },
+    'Tamil Nadu': {
+        'luxury': ['Taj Fisherman\'s Cove Chennai', 'The Leela Palace Chennai', 'Fortune Resort Bay Island'],
+        'mid_range': ['Hotel Sangam Thanjavur', 'GRT Grand Chennai', 'Sterling Yelagiri'],
+        'budget': ['Zostel Pondicherry', 'Backpacker Panda Kodaikanal', 'Hotel Saravana Bhavan Lodge']
+    }
+})
+
+# Restaurant recommendations by destination
+RESTAURANT_RECOMMENDATIONS = freeze({
+    'Goa': {
+        'fine_dining': ['Thalassa', 'La Plage', 'Bomra\'s'],
+        'local_cuisine': ['Vinayak Family Restaurant', 'Mum\'s Kitchen', 'Fish Curry Rice'],
+        'street_food': ['Goa Bhel', 'Bebinca Cafe', 'Cafe Chocolatti'],
+        'beach_shacks': ['Curlies Beach Shack', 'Shiva Valley', 'Anjuna Beach Restaurant']
+    },
+    'Kerala': {
+        'fine_dining': ['Dhe Puttu', 'Casino Hotel Restaurant', 'The Rice Boat'],
+        'local_cuisine': ['Saravana Bhavan', 'Aryaas Restaurant', 'Hotel Rahmath'],
+        'street_food': ['Kozhikode Biryani Stall', 'Ernakulam Food Street', 'Kochi Spice Market'],
+        'backwater_dining': ['Backwater Ripples', 'Lake Palace Restaurant', 'Coconut Lagoon']
+    },
+    'Rajasthan': {
+        'fine_dining': ['1135 AD Restaurant', 'Ambrai Restaurant', 'Handi Restaurant'],
+        'local_cuisine': ['Chokhi Dhani', 'Laxmi Misthan Bhandar', 'Rawat Mishtan Bhandar'],
+        'street_food': ['Johri Bazaar Food Street', 'Bapu Bazaar', 'Clock Tower Market'],
+        'rooftop_dining': ['Upre Restaurant', 'Sky Deck Lounge', 'Sunset Terrace']
+    },
+    'Himachal Pradesh': {
+        'fine_dining': ['The Restaurant at Wildflower Hall', 'Eighteen71 Cookhouse & Bar', 'Wake & Bake Cafe'],
+        'local_cuisine': ['Sher-e-Punjab', 'Johnson Cafe', 'Cafe 1947'],
+        'mountain_cafes': ['Moon Dance Cafe', 'German Bakery Kasol', 'Evergreen Cafe'],
+        'street_food': ['Mall Road Food Stalls', 'Manali Market', 'Old Manali Cafes']
+    },
+    'Karnataka': {
+        'fine_dining': ['Karavalli', 'Toit Brewpub', 'The Only Place'],
+        'local_cuisine': ['MTR Restaurant', 'Vidyarthi Bhavan', 'Brahmin\'s Coffee Bar'],
+        'street_food': ['VV Puram Food Street', 'Commercial Street Eateries', 'Russell Market'],
+        'coastal_cuisine': ['Gokarna Beach Restaurants', 'Udupi Krishna Bhavan', 'Fisherman\'s Wharf']
+    },
+    'Maharashtra': {
+        'fine_dining': ['Trishna', 'The Table', 'Indigo Delicatessen'],
+        'local_cuisine': ['Britannia & Co.', 'Cafe Madras', 'Hotel Goodluck'],
+        'street_food': ['Mohammed Ali Road', 'Juhu Beach Chaat', 'Crawford Market'],
+        'hill_station': ['Hotel Chandralok Lonavala', 'Rama Krishna Restaurant', 'German Bakery Pune']
+    },
+    'Tamil Nadu': {
+        'fine_dining': ['Dakshin Restaurant', 'Benjarong', 'Peshawri'],
+        'local_cuisine': ['Murugan Idli Shop', 'Saravana Bhavan', 'Hotel Junior Kuppanna'],
+        'street_food': ['Marina Beach Food Stalls', 'T Nagar Food Street', 'Pondy Bazaar'],
+        'temple_food': ['Annapoorna Restaurant', 'Amma Unavagam', 'Krishna Sweets']
+    }
+})
+
+# Default recommendations if destination not found
+DEFAULT_HOTELS = freeze({
+    'luxury': ['Premium Heritage Hotel', 'Luxury Resort & Spa', 'Grand Palace Hotel'],
+    'mid_range': ['Comfort Inn Hotel', 'Best Western Hotel', 'Holiday Resort'],
+    'budget': ['OYO Hotels', 'Budget Backpacker Hostel', 'Economy Lodge']
+})
+
+DEFAULT_RESTAURANTS = freeze({
+    'fine_dining': ['Premium Fine Dining Restaurant', 'Luxury Multi-Cuisine Restaurant'],
+    'local_cuisine': ['Local Traditional Restaurant', 'Authentic Regional Cuisine'],
+    'street_food': ['Local Food Street', 'Traditional Market Eateries'],
+    'cafes': ['Local Coffee House', 'Traditional Tea Stall']
+})
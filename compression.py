@@ -0,0 +1,71 @@
+"""
+Response compression for AI Travel Chatbot
+Negotiates brotli/gzip for dynamic responses above a size threshold. Brotli
+is used only when the optional `brotli` package is installed.
+"""
+
+import gzip
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+
+def available_encodings():
+    """Content encodings this process can produce, best first"""
+    return ['br', 'gzip'] if brotli else ['gzip']
+
+
+def compress(data, encoding, level=6):
+    """Compress bytes with the given content encoding"""
+    if encoding == 'br':
+        # Brotli quality runs 0-11; map the gzip-style 1-9 level onto it
+        return brotli.compress(data, quality=min(11, level + 2))
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def negotiate_encoding(encodings=None):
+    """Pick the client's preferred encoding among the ones offered, or None"""
+    accepted = request.accept_encodings
+    best = None
+    for encoding in encodings or available_encodings():
+        quality = accepted[encoding]
+        if quality and (best is None or quality > accepted[best]):
+            best = encoding
+    return best
+
+
+def init_app(app):
+    """Compress eligible responses after each request"""
+    mimetypes = set(app.config['COMPRESS_MIMETYPES'])
+
+    @app.after_request
+    def compress_response(response):
+        if not app.config['COMPRESS_ENABLED']:
+            return response
+
+        if response.mimetype not in mimetypes:
+            return response
+        response.vary.add('Accept-Encoding')
+        if (response.status_code < 200 or response.status_code in (204, 304)
+                or response.direct_passthrough or response.is_streamed
+                or 'Content-Encoding' in response.headers
+                or (response.content_length or 0) < app.config['COMPRESS_MIN_SIZE']):
+            return response
+
+        encoding = negotiate_encoding()
+        if encoding is None:
+            return response
+
+        response.set_data(compress(response.get_data(), encoding, app.config['COMPRESS_LEVEL']))
+        response.headers['Content-Encoding'] = encoding
+        # The compressed body differs byte-for-byte, so only a weak validator still holds
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
@@ -1,5 +1,7 @@
 import os
 
+from catalog import freeze
+
 class Config:
     # Secret key for session management and CSRF protection
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'your-secret-key-change-in-production'
@@ -18,6 +20,8 @@ class Config:
     # SQLAlchemy settings
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ECHO = False  # Set to True for debugging SQL queries
+    SQL_STATS_ENABLED = True  # Per-request query counts (see sql_stats.py)
+    SQL_REPEATED_QUERY_THRESHOLD = 5  # Same statement shape this often in one request = likely N+1
     
     # Supabase Configuration
     SUPABASE_URL = os.environ.get('SUPABASE_URL') or 'https://your-project.supabase.co'
@@ -29,13 +33,108 @@ class Config:
     # Flask-Login settings
     SESSION_PERMANENT = False
     PERMANENT_SESSION_LIFETIME = 3600  # 1 hour
+    USER_CACHE_TTL = 60  # Seconds a loaded user is reused while it matches the session's credential stamp
+    
+    # Server-side sessions (see server_session.py); the cookie only holds a session id
+    SERVER_SESSIONS = True
+    SESSION_STORE_FILE = 'sessions.db'  # Inside the instance folder, shared by workers
+    SESSION_CACHE_SIZE = 1024  # Decoded sessions kept in memory per process
+    
+    # Password hashing (see passwords.py); changing the method rehashes passwords at next login
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')  # or e.g. 'pbkdf2:sha256:600000'
+    PASSWORD_HASH_WORKERS = 2  # Processes that hash passwords; 0 hashes on the request thread
     
     # File upload settings
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     
+    # Parsed itinerary plans kept in memory per process
+    PLAN_CACHE_SIZE = 256
+    
+    # Rendered HTML reuse: public pages for anonymous visitors, per-user sidebars
+    PAGE_CACHE_TTL = 300  # Seconds; 0 disables the page cache
+    FRAGMENT_CACHE_TTL = 300
+    
+    # Templates compiled at startup and cached as bytecode (see template_cache.py)
+    TEMPLATE_PRECOMPILE = True
+    TEMPLATE_BYTECODE_CACHE_DIR = 'jinja_cache'  # Inside the instance folder, shared by workers
+    
+    # Admission control (see ratelimit.py)
+    RATELIMIT_ENABLED = True
+    RATELIMIT_STORAGE = os.environ.get('RATELIMIT_STORAGE', 'memory')  # 'memory' or 'sqlite' to share across workers
+    RATELIMIT_SQLITE_FILE = 'ratelimit.db'  # Inside the instance folder
+    RATELIMITS = {  # Endpoint: (requests, per seconds), keyed by user id or client IP
+        'main.api_chat': (20, 60),
+        'main.api_create_itinerary': (10, 60),
+        'main.api_optimize_budget': (20, 60),
+        'main.api_apply_optimization': (10, 60),
+        'main.login': (10, 60),
+        'main.signup': (5, 60)
+    }
+    MAX_CONCURRENT_REQUESTS = 64  # In flight per process; extra requests get a 503, 0 disables
+    # Reverse proxies in front of the app whose X-Forwarded-For is trusted (1 behind Nginx), 0 when exposed directly
+    PROXY_FIX_X_FOR = int(os.environ.get('PROXY_FIX_X_FOR', 0))
+    
+    # Structured logging (see structured_logging.py)
+    LOG_LEVEL = os.environ.get('LOG_LEVEL') or 'INFO'
+    LOG_FORMAT = os.environ.get('LOG_FORMAT') or 'json'  # 'json' lines or Flask-style 'text'
+    LOG_QUEUE_SIZE = 10000  # Records waiting for the writer thread; more are dropped, never waited on
+    LOG_SAMPLE_RATES = {  # Fraction of each event kept; unlisted events are always logged
+        'itinerary_created': 0.1,
+        'budget_optimization_requested': 0.1,
+        'optimization_applied': 0.1,
+        'rate_limited': 0.1
+    }
+    
+    # Request metrics served at /metrics (see metrics.py)
+    METRICS_ENABLED = True
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # If set, scrapers must send it as a Bearer token
+    METRICS_LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]  # Seconds
+    
+    # Request tracing (see tracing.py); spans are written as OTLP/JSON lines
+    TRACING_ENABLED = True
+    TRACE_SAMPLE_RATE = float(os.environ.get('TRACE_SAMPLE_RATE') or 0.05)  # Fraction of requests recorded
+    TRACE_EXPORTER = os.environ.get('TRACE_EXPORTER') or 'file'  # 'file', 'memory' or 'none' (ids only)
+    TRACE_FILE = 'traces.jsonl'  # Relative to instance folder
+    TRACE_FILE_MAX_BYTES = 50 * 1024 * 1024  # Then moved to traces.jsonl.1
+    TRACE_QUEUE_SIZE = 1000  # Traces waiting for the writer thread; more are dropped
+    TRACE_SERVICE_NAME = 'paradiseride'
+    
+    # Request profiling (see profiling.py)
+    PROFILE_TOKEN = os.environ.get('PROFILE_TOKEN')  # Send as X-Profile header or ?_profile= to profile a request
+    PROFILE_SAMPLE_RATE = int(os.environ.get('PROFILE_SAMPLE_RATE') or 0)  # Profile 1 in N requests, 0 disables
+    PROFILE_SAMPLE_ENDPOINTS = ['main.api_create_itinerary', 'main.api_optimize_budget', 'main.api_apply_optimization']
+    PROFILE_SAMPLE_MODE = 'sample'  # 'sample' (stack sampling, cheap) or 'cprofile' (exact, slower)
+    PROFILE_SAMPLE_INTERVAL = 0.001  # Seconds between stack samples
+    PROFILE_DIR = 'profiles'  # Relative to instance folder
+    PROFILE_KEEP = 200  # Newest profile files kept
+    
+    # Response compression (see compression.py and build_assets.py)
+    COMPRESS_ENABLED = True
+    COMPRESS_MIN_SIZE = 1024  # Bytes; smaller responses are sent uncompressed
+    COMPRESS_LEVEL = 6
+    COMPRESS_MIMETYPES = ['text/html', 'text/css', 'text/plain', 'text/javascript',
+                          'application/javascript', 'application/json', 'image/svg+xml']
+    
+    # Fingerprinted static assets (see static_assets.py)
+    ASSET_MANIFEST = 'manifest.json'  # Written to static/ by build_assets.py
+    ASSET_MAX_AGE = 365 * 24 * 3600  # Fingerprinted URLs never change content
+    
+    # Responsive images (see images.py; variants are written by build_assets.py)
+    IMAGE_SOURCE_DIRS = ['images/team']  # Relative to static/
+    IMAGE_WIDTHS = [160, 320, 640]  # Capped at each image's own width
+    IMAGE_FORMATS = ['avif', 'webp']  # Most preferred first; written when Pillow can encode them
+    IMAGE_QUALITY = {'avif': 50, 'webp': 75, 'jpeg': 80}  # AVIF looks as good at a lower setting
+    IMAGE_MANIFEST = 'images.json'  # Written to static/ by build_assets.py
+    
     # Pagination settings
     POSTS_PER_PAGE = 10
-    
+
+    # Search history retention (see retention.py)
+    SEARCH_HISTORY_RETENTION_DAYS = int(os.environ.get('SEARCH_HISTORY_RETENTION_DAYS') or 180)
+    SEARCH_HISTORY_MAX_PER_USER = int(os.environ.get('SEARCH_HISTORY_MAX_PER_USER') or 500)
+    SEARCH_HISTORY_ARCHIVE_DIR = os.environ.get('SEARCH_HISTORY_ARCHIVE_DIR') or 'archives'  # Relative to instance folder
+    RETENTION_BATCH_SIZE = 500  # Rows archived and deleted per transaction
+
     # Email settings (for future use)
     MAIL_SERVER = os.environ.get('MAIL_SERVER')
     MAIL_PORT = int(os.environ.get('MAIL_PORT') or 587)
@@ -46,9 +145,10 @@ class Config:
     # App settings
     APP_NAME = "ParadiseRide - AI Travel Chatbot"
     APP_VERSION = "1.0.0"
+    BUILD_ID = os.environ.get('BUILD_ID')  # Part of every HTML ETag; hashed from assets and templates when unset
 
-# Mood to destination mapping
-MOOD_DESTINATIONS = {
+# Mood to destination mapping (frozen, see catalog.py)
+MOOD_DESTINATIONS = freeze({
     'calm': {
         'destinations': [
             {
@@ -217,4 +317,4 @@ MOOD_DESTINATIONS = {
             }
         ]
     }
-}
\ No newline at end of file
+})
@@ -0,0 +1,72 @@
+"""
+JSON serialization for AI Travel Chatbot
+Uses orjson when it is installed and falls back to the standard library.
+
+Payloads stored in the database (search results, itinerary plans) are always
+written with json.dumps so their bytes stay identical to existing rows; only
+parsing and API responses go through orjson.
+"""
+
+import json
+
+from flask.json.provider import DefaultJSONProvider
+
+from tracing import span
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(data):
+    """Parse a JSON string or bytes"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_stored(obj):
+    """Serialize a payload for database storage, byte-identical to json.dumps"""
+    with span('json.dumps_stored'):
+        return json.dumps(obj)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that serializes compact responses with orjson when available"""
+
+    def _orjson_dumps(self, obj):
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        # Dates and other non-native types go through Flask's default() so output matches jsonify
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        try:
+            return self._orjson_dumps(obj).decode('utf-8')
+        except orjson.JSONEncodeError:
+            return super().dumps(obj)
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        with span('json.response'):
+            return self._response(*args, **kwargs)
+
+    def _response(self, *args, **kwargs):
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        if orjson is None or pretty:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        try:
+            body = self._orjson_dumps(obj)
+        except orjson.JSONEncodeError:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
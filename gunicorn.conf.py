@@ -0,0 +1,46 @@
+"""
+Gunicorn configuration for AI Travel Chatbot
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+The app (and with it the travel catalog, templates and asset manifest) is
+loaded once in the master. Each worker is then forked from a frozen heap and
+shares those pages copy-on-write instead of building its own copy. Every
+worker logs its memory after boot so the effect can be checked per node.
+"""
+
+import gc
+import multiprocessing
+import os
+
+import catalog
+
+bind = os.environ.get('BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+preload_app = True
+
+# Stop the collector from touching preloaded objects before they are frozen
+gc.disable()
+
+
+def format_memory(usage):
+    """One-line summary of catalog.memory_usage()"""
+    if 'private' not in usage:
+        return f"peak RSS {usage['rss']:,} kB"
+    return f"RSS {usage['rss']:,} kB (shared {usage['shared']:,} kB, private {usage['private']:,} kB)"
+
+
+def when_ready(server):
+    server.log.info(f"Master {os.getpid()} preloaded app: {format_memory(catalog.memory_usage())}")
+
+
+def pre_fork(server, worker):
+    catalog.freeze_heap()
+
+
+def post_fork(server, worker):
+    gc.enable()
+
+
+def post_worker_init(worker):
+    worker.log.info(f"Worker {worker.pid} booted: {format_memory(catalog.memory_usage())}")
@@ -0,0 +1,170 @@
+"""
+Responsive images for AI Travel Chatbot
+The team page used to send the full-size photos to every visitor, whatever
+size they were displayed at. build_assets.py now writes resized copies of each
+source image (in AVIF and WebP as well as the original format) into a
+variants/ folder beside it, plus a manifest mapping every source image to its
+variants.
+
+Templates render images with responsive_image(), which emits a <picture> with
+srcset/sizes so the browser picks the smallest file that looks sharp. Without
+a manifest (or Pillow) it falls back to a plain <img> of the original file.
+"""
+
+import json
+import os
+
+from flask import current_app
+from markupsafe import Markup, escape
+
+from static_assets import asset_url
+
+try:
+    from PIL import Image, features
+except ImportError:  # Pillow is only needed to build variants, not to serve them
+    Image = None
+    features = None
+
+SOURCE_FORMATS = {'.jpg': 'jpeg', '.jpeg': 'jpeg', '.png': 'png'}
+FORMAT_EXTENSIONS = {'avif': '.avif', 'webp': '.webp', 'jpeg': '.jpg', 'png': '.png'}
+FORMAT_MIMETYPES = {'avif': 'image/avif', 'webp': 'image/webp', 'jpeg': 'image/jpeg', 'png': 'image/png'}
+
+
+def supported_formats(formats):
+    """The requested modern formats this Pillow build can encode"""
+    if Image is None:
+        return []
+    return [fmt for fmt in formats if features.check(fmt)]
+
+
+def variant_name(filename, width, fmt):
+    """images/team/divesh.jpg -> images/team/variants/divesh-320w.webp"""
+    folder, name = os.path.split(filename)
+    stem = os.path.splitext(name)[0]
+    return f"{folder}/variants/{stem}-{width}w{FORMAT_EXTENSIONS[fmt]}".lstrip('/')
+
+
+def iter_source_images(static_folder, source_dirs):
+    """Yield source images (relative to static/) under the configured folders"""
+    for source_dir in source_dirs:
+        folder = os.path.join(static_folder, source_dir)
+        if not os.path.isdir(folder):
+            continue
+        for name in sorted(os.listdir(folder)):
+            if os.path.splitext(name)[1].lower() in SOURCE_FORMATS:
+                yield f"{source_dir}/{name}"
+
+
+def save_variant(image, path, fmt, quality):
+    """Encode one resized copy"""
+    options = {'quality': quality.get(fmt, 75)}
+    if fmt == 'jpeg':
+        options.update(optimize=True, progressive=True)
+    elif fmt == 'png':
+        options = {'optimize': True}
+    elif fmt == 'webp':
+        options['method'] = 6
+    image.save(path, fmt.upper(), **options)
+
+
+def build_image_variants(static_folder, source_dirs, widths, formats, quality):
+    """Write resized/re-encoded variants of every source image and return the image manifest
+
+    quality maps a format to its encoder quality. Variants that are newer than
+    their source are kept as they are.
+    """
+    if Image is None:
+        raise RuntimeError("Pillow is required to build image variants (pip install Pillow)")
+
+    manifest = {}
+    for filename in iter_source_images(static_folder, source_dirs):
+        source = os.path.join(static_folder, filename)
+        source_mtime = os.stat(source).st_mtime
+        with Image.open(source) as original:
+            original.load()
+            source_format = SOURCE_FORMATS[os.path.splitext(filename)[1].lower()]
+            source_width, source_height = original.size
+            # Never upscale: widths past the original collapse onto the original width
+            targets = sorted({min(width, source_width) for width in widths})
+
+            variants = {}
+            for fmt in supported_formats(formats) + [source_format]:
+                variants[fmt] = []
+                for width in targets:
+                    if fmt == source_format and width == source_width:
+                        variants[fmt].append([width, filename])
+                        continue
+                    name = variant_name(filename, width, fmt)
+                    path = os.path.join(static_folder, name)
+                    if not (os.path.exists(path) and os.stat(path).st_mtime >= source_mtime):
+                        os.makedirs(os.path.dirname(path), exist_ok=True)
+                        height = round(source_height * width / source_width)
+                        resized = original if width == source_width else original.resize(
+                            (width, height), Image.Resampling.LANCZOS)
+                        if fmt == 'jpeg' and resized.mode not in ('RGB', 'L'):
+                            resized = resized.convert('RGB')
+                        save_variant(resized, path, fmt, quality)
+                    variants[fmt].append([width, name])
+
+        manifest[filename] = {'width': source_width, 'height': source_height, 'variants': variants}
+    return manifest
+
+
+def load_image_manifest(app):
+    """Read the image manifest written by build_assets.py, or {} if images were never built"""
+    try:
+        with open(os.path.join(app.static_folder, app.config['IMAGE_MANIFEST']), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def get_image_manifest():
+    """Image manifest for the current app; re-read on every call in debug mode"""
+    if current_app.debug:
+        current_app.extensions['images'] = load_image_manifest(current_app)
+    return current_app.extensions['images']
+
+
+def render_attributes(attributes):
+    """Render HTML attributes, skipping None; a trailing underscore allows class_"""
+    return ''.join(f' {name.rstrip("_")}="{escape(value)}"'
+                   for name, value in attributes.items() if value is not None)
+
+
+def srcset(candidates):
+    """Build a srcset value from [width, filename] pairs"""
+    return ', '.join(f"{asset_url('static', filename=name)} {width}w" for width, name in candidates)
+
+
+def responsive_image(filename, alt, sizes='100vw', **attributes):
+    """<picture> markup for a static image, using its variants when they have been built"""
+    entry = get_image_manifest().get(filename)
+    if entry is None:
+        img = render_attributes({'src': asset_url('static', filename=filename), 'alt': alt, **attributes})
+        return Markup(f"<img{img}>")
+
+    variants = entry['variants']
+    source_format = SOURCE_FORMATS[os.path.splitext(filename)[1].lower()]
+    # The browser takes the first <source> it supports, so list formats in order of preference
+    sources = ''.join(
+        f"<source{render_attributes({'type': FORMAT_MIMETYPES[fmt], 'srcset': srcset(variants[fmt]), 'sizes': sizes})}>"
+        for fmt in current_app.config['IMAGE_FORMATS'] if fmt in variants and fmt != source_format
+    )
+    img = render_attributes({
+        'src': asset_url('static', filename=filename),
+        'srcset': srcset(variants[source_format]),
+        'sizes': sizes,
+        'width': entry['width'],
+        'height': entry['height'],
+        'alt': alt,
+        'decoding': 'async',
+        **attributes
+    })
+    return Markup(f"<picture>{sources}<img{img}></picture>")
+
+
+def init_app(app):
+    """Load the image manifest and expose responsive_image() to templates"""
+    app.extensions['images'] = load_image_manifest(app)
+    app.jinja_env.globals['responsive_image'] = responsive_image
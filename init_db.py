@@ -3,9 +3,11 @@ Database initialization script for AI Travel Chatbot
 This script creates all necessary database tables
 """
 
-from app import app, db
+from app import create_app, db
 from models import User, SearchHistory, Itinerary
 
+app = create_app()
+
 def init_database():
     """Initialize the database with all tables"""
     print("Initializing database...")
@@ -24,7 +26,7 @@ def init_database():
             
             # Check if tables exist by counting
             user_count = User.query.count()
-            search_count = SearchHistory.query.count()
+            search_count = db.session.query(SearchHistory).count()
             itinerary_count = Itinerary.query.count()
             
             print(f"\nCurrent database status:")
@@ -0,0 +1,191 @@
+"""
+Request metrics for AI Travel Chatbot
+Records per-endpoint latency histograms, request counts by status, in-flight
+requests and response sizes, and serves them at /metrics in the Prometheus
+text format.
+
+Recording takes no locks: each thread updates its own set of counters and
+/metrics adds them up when it is scraped. A scrape can therefore see a
+request's count a moment before its latency sum, which is fine for
+monitoring. Figures are per process, so with several gunicorn workers each
+scrape describes the worker that answered it.
+"""
+
+import threading
+import time
+import weakref
+from bisect import bisect_left
+
+from flask import Response, g, request
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+# name -> (type, help text, histogram buckets)
+DEFINITIONS = {}
+
+
+def define(name, kind, help_text, buckets=None):
+    """Declare a metric ('counter', 'gauge' or 'histogram') before recording it"""
+    DEFINITIONS[name] = (kind, help_text, tuple(buckets) if buckets else None)
+
+
+define('http_requests_total', 'counter', 'Requests handled, by endpoint, method and status')
+define('http_requests_in_flight', 'gauge', 'Requests currently being handled, by endpoint')
+define('http_request_duration_seconds', 'histogram', 'Time to handle a request, by endpoint', LATENCY_BUCKETS)
+define('http_response_size_bytes', 'histogram', 'Response body size, by endpoint', SIZE_BUCKETS)
+
+
+class ThreadStats:
+    """Metrics recorded by one thread; only that thread writes to it"""
+
+    def __init__(self):
+        # (name, labels) -> value, or [bucket counts..., sum] for histograms
+        self.values = {}
+
+    def merge_into(self, totals):
+        for key, value in list(self.values.items()):
+            if isinstance(value, list):
+                merged = totals.setdefault(key, [0] * len(value))
+                for i, item in enumerate(value):
+                    merged[i] += item
+            else:
+                totals[key] = totals.get(key, 0) + value
+
+
+_local = threading.local()
+_registry_lock = threading.Lock()
+_live = set()
+_retired = {}
+_started = time.time()
+
+
+def _retire(stats):
+    """Fold a finished thread's metrics into the retired totals"""
+    with _registry_lock:
+        _live.discard(stats)
+        stats.merge_into(_retired)
+
+
+def _thread_stats():
+    stats = getattr(_local, 'stats', None)
+    if stats is None:
+        stats = _local.stats = ThreadStats()
+        with _registry_lock:
+            _live.add(stats)
+        # Threads come and go (e.g. the threaded dev server), so keep their totals when they exit
+        weakref.finalize(threading.current_thread(), _retire, stats)
+    return stats
+
+
+def inc(name, amount=1, **labels):
+    """Add to a counter or gauge"""
+    values = _thread_stats().values
+    key = (name, tuple(labels.items()))
+    values[key] = values.get(key, 0) + amount
+
+
+def observe(name, value, **labels):
+    """Record one value in a histogram"""
+    values = _thread_stats().values
+    key = (name, tuple(labels.items()))
+    buckets = DEFINITIONS[name][2]
+    counts = values.get(key)
+    if counts is None:
+        # One slot per bucket, one for +Inf, then the running sum
+        counts = values[key] = [0] * (len(buckets) + 2)
+    counts[bisect_left(buckets, value)] += 1
+    counts[-1] += value
+
+
+def collect():
+    """Sum every thread's metrics into one {(name, labels): value} dict"""
+    with _registry_lock:
+        totals = {key: list(value) if isinstance(value, list) else value for key, value in _retired.items()}
+        for stats in list(_live):
+            stats.merge_into(totals)
+    return totals
+
+
+def format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def format_number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus(totals=None):
+    """Render metrics in the Prometheus text exposition format"""
+    totals = collect() if totals is None else totals
+    by_name = {}
+    for (name, labels), value in totals.items():
+        by_name.setdefault(name, []).append((labels, value))
+
+    lines = ['# HELP process_start_time_seconds Start time of the process since the epoch',
+             '# TYPE process_start_time_seconds gauge',
+             f'process_start_time_seconds {_started:.3f}']
+    for name, (kind, help_text, buckets) in DEFINITIONS.items():
+        if name not in by_name:
+            continue
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, value in sorted(by_name[name]):
+            if kind != 'histogram':
+                lines.append(f'{name}{format_labels(labels)} {format_number(value)}')
+                continue
+            cumulative = 0
+            for bound, count in zip(buckets + ('+Inf',), value[:-1]):
+                cumulative += count
+                lines.append(f'{name}_bucket{format_labels(labels, [("le", bound)])} {cumulative}')
+            lines.append(f'{name}_sum{format_labels(labels)} {format_number(value[-1])}')
+            lines.append(f'{name}_count{format_labels(labels)} {cumulative}')
+    return '\n'.join(lines) + '\n'
+
+
+def init_app(app):
+    """Time every request and serve /metrics
+
+    Call this before other extensions register hooks, so rejected requests are
+    still counted and response sizes are measured after compression.
+    """
+    if not app.config['METRICS_ENABLED']:
+        return
+
+    define('http_request_duration_seconds', 'histogram', DEFINITIONS['http_request_duration_seconds'][1],
+           app.config['METRICS_LATENCY_BUCKETS'])
+
+    @app.before_request
+    def start_request_timer():
+        g.metrics_endpoint = request.endpoint or 'unmatched'
+        g.metrics_started = time.perf_counter()
+        inc('http_requests_in_flight', endpoint=g.metrics_endpoint)
+
+    @app.after_request
+    def record_request(response):
+        started = g.get('metrics_started')
+        if started is not None:
+            endpoint = g.metrics_endpoint
+            observe('http_request_duration_seconds', time.perf_counter() - started, endpoint=endpoint)
+            inc('http_requests_total', endpoint=endpoint, method=request.method, status=response.status_code)
+            if response.content_length is not None:
+                observe('http_response_size_bytes', response.content_length, endpoint=endpoint)
+        return response
+
+    @app.teardown_request
+    def finish_request(exc):
+        if g.pop('metrics_started', None) is not None:
+            inc('http_requests_in_flight', -1, endpoint=g.metrics_endpoint)
+
+    def metrics_view():
+        token = app.config['METRICS_TOKEN']
+        if token and request.headers.get('Authorization') != f'Bearer {token}':
+            return Response('Unauthorized\n', 401, {'WWW-Authenticate': 'Bearer'})
+        return Response(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8',
+                        headers={'Cache-Control': 'no-store'})
+
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
@@ -1,10 +1,26 @@
+from flask import current_app
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+import hashlib
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import load_only, make_transient_to_detached
+
+from caching import LRUCache, TTLCache
+import fast_json
+import passwords
 
 db = SQLAlchemy()
 
+# Identity snapshots for the Flask-Login user loader, keyed by user id
+user_cache = TTLCache(ttl=60, maxsize=1024)
+
+# Parsed detailed plans keyed by itinerary id, stored as (updated_at, plan)
+plan_cache = LRUCache(maxsize=256)
+
+# Rendered per-user page fragments keyed by (fragment name, user id, data version)
+fragment_cache = TTLCache(ttl=300, maxsize=1024)
+
 class User(UserMixin, db.Model):
     """User model for authentication and user management"""
     
@@ -29,11 +45,16 @@ class User(UserMixin, db.Model):
     
     def set_password(self, password):
         """Hash and set the user's password"""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = passwords.hash_password(password)
     
     def check_password(self, password):
         """Check if provided password matches the hashed password"""
-        return check_password_hash(self.password_hash, password)
+        return passwords.verify_password(self.password_hash, password)
+    
+    @property
+    def credential_stamp(self):
+        """Short digest that changes whenever the password hash or active flag does"""
+        return credential_stamp(self.password_hash, self.is_active)
     
     def get_id(self):
         """Return the user id as a string for Flask-Login"""
@@ -76,10 +97,30 @@ class User(UserMixin, db.Model):
         return f'<User {self.email}>'
 
 
+def credential_stamp(password_hash, is_active):
+    """Digest of the columns that decide whether an existing login is still valid"""
+    return hashlib.sha256(f"{password_hash}:{bool(is_active)}".encode()).hexdigest()[:16]
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _revoke_sessions_on_credential_change(mapper, connection, target):
+    """Log the user out everywhere when their password or active flag changes, or they are deleted"""
+    state = inspect(target)
+    if not state.deleted and not state.attrs.password_hash.history.has_changes() \
+            and not state.attrs.is_active.history.has_changes():
+        return
+    invalidate_user_cache(target.id)
+    revoke_user = getattr(current_app.session_interface, 'revoke_user', None)
+    if revoke_user is not None:
+        revoke_user(target.id)
+
+
 class SearchHistory(db.Model):
     """Model to store user's mood-based search history"""
     
     __tablename__ = 'search_history'
+    # Ids are never reused after deletes, so the rollup cursor (see analytics.py) sees every new search
+    __table_args__ = {'sqlite_autoincrement': True}
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -98,16 +139,14 @@ class SearchHistory(db.Model):
     
     def get_result_dict(self):
         """Parse the JSON result string back to dictionary"""
-        import json
         try:
-            return json.loads(self.result)
+            return fast_json.loads(self.result)
         except:
             return {}
     
     def set_result_dict(self, result_dict):
         """Convert dictionary to JSON string for storage"""
-        import json
-        self.result = json.dumps(result_dict)
+        self.result = fast_json.dumps_stored(result_dict)
     
     def mark_as_favorite(self):
         """Mark this search as favorite"""
@@ -122,7 +161,16 @@ class SearchHistory(db.Model):
     def set_rating(self, rating):
         """Set user rating for this search (1-5)"""
         if 1 <= rating <= 5:
+            # Wait for a running rollup batch to commit, then keep it out until this change has
+            # committed, so the rating is counted by exactly one of the two
+            folded_up_to = lock_rollup_cursor(MOOD_ROLLUP_CURSOR)
+            previous = self.rating
             self.rating = rating
+            # Searches already folded into the mood rollups need their rating totals adjusted
+            if self.id <= folded_up_to:
+                rating_delta = {'rating_sum': rating - (previous or 0), 'rating_count': 0 if previous else 1}
+                increment_rollup(MoodDailyRollup, {'day': self.timestamp.date(), 'mood': self.mood}, **rating_delta)
+                increment_rollup(MoodRollup, {'mood': self.mood}, **rating_delta)
             db.session.commit()
     
     def to_dict(self):
@@ -137,6 +185,17 @@ class SearchHistory(db.Model):
             'is_favorite': self.is_favorite
         }
     
+    def to_summary_dict(self):
+        """Convert search history object to a listing dictionary without the result payload"""
+        return {
+            'id': self.id,
+            'mood': self.mood,
+            'query': self.query,
+            'timestamp': self.timestamp.isoformat(),
+            'rating': self.rating,
+            'is_favorite': self.is_favorite
+        }
+    
     def __repr__(self):
         return f'<SearchHistory {self.mood} by User {self.user_id}>'
 
@@ -181,17 +240,31 @@ class Itinerary(db.Model):
         self.duration_days = (end_date - start_date).days + 1
     
     def get_detailed_plan_dict(self):
-        """Parse the JSON detailed_plan string back to dictionary"""
-        import json
+        """Parse the JSON detailed_plan string back to dictionary.
+        
+        Parsed plans are shared through plan_cache, so callers must not mutate the result.
+        """
+        if self.id is None or inspect(self).attrs.detailed_plan.history.has_changes():
+            return self._parse_detailed_plan()
+        
+        cached = plan_cache.get(self.id)
+        if cached is not None and cached[0] == self.updated_at:
+            return cached[1]
+        
+        plan = self._parse_detailed_plan()
+        plan_cache.set(self.id, (self.updated_at, plan))
+        return plan
+    
+    def _parse_detailed_plan(self):
+        """Parse detailed_plan without going through the cache"""
         try:
-            return json.loads(self.detailed_plan)
+            return fast_json.loads(self.detailed_plan)
         except:
             return {}
     
     def set_detailed_plan_dict(self, plan_dict):
         """Convert dictionary to JSON string for storage"""
-        import json
-        self.detailed_plan = json.dumps(plan_dict)
+        self.detailed_plan = fast_json.dumps_stored(plan_dict)
     
     def mark_as_completed(self):
         """Mark this itinerary as completed"""
@@ -246,6 +319,11 @@ class Itinerary(db.Model):
         """Alias for detailed_plan for template compatibility"""
         return self.detailed_plan
     
+    @property
+    def plan(self):
+        """Parsed detailed plan for templates, served from plan_cache"""
+        return self.get_detailed_plan_dict()
+    
     def to_dict(self):
         """Convert itinerary object to dictionary"""
         return {
@@ -270,10 +348,81 @@ class Itinerary(db.Model):
             'updated_at': self.updated_at.isoformat()
         }
     
+    def to_summary_dict(self):
+        """Convert itinerary object to a listing dictionary without the large text columns"""
+        return {
+            'id': self.id,
+            'title': self.title,
+            'destination': self.destination,
+            'start_date': self.start_date.isoformat(),
+            'end_date': self.end_date.isoformat(),
+            'budget': self.budget,
+            'duration_days': self.duration_days,
+            'mood_tag': self.mood_tag,
+            'is_completed': self.is_completed,
+            'is_favorite': self.is_favorite,
+            'status': self.get_status(),
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat()
+        }
+    
     def __repr__(self):
         return f'<Itinerary {self.title} to {self.destination}>'
 
 
+class MoodDailyRollup(db.Model):
+    """Searches and ratings per mood per day, maintained incrementally by analytics.py"""
+    
+    __tablename__ = 'mood_daily_rollups'
+    
+    day = db.Column(db.Date, primary_key=True)
+    mood = db.Column(db.String(50), primary_key=True)
+    search_count = db.Column(db.Integer, default=0, nullable=False)
+    rating_sum = db.Column(db.Integer, default=0, nullable=False)
+    rating_count = db.Column(db.Integer, default=0, nullable=False)
+
+
+class MoodRollup(db.Model):
+    """All-time searches and ratings per mood"""
+    
+    __tablename__ = 'mood_rollups'
+    
+    mood = db.Column(db.String(50), primary_key=True)
+    search_count = db.Column(db.Integer, default=0, nullable=False)
+    rating_sum = db.Column(db.Integer, default=0, nullable=False)
+    rating_count = db.Column(db.Integer, default=0, nullable=False)
+    
+    def get_average_rating(self):
+        """Average rating across rated searches, or None if nothing was rated"""
+        return round(self.rating_sum / self.rating_count, 2) if self.rating_count else None
+
+
+class MoodDestinationRollup(db.Model):
+    """How often each destination was recommended for a mood"""
+    
+    __tablename__ = 'mood_destination_rollups'
+    
+    mood = db.Column(db.String(50), primary_key=True)
+    destination = db.Column(db.String(100), primary_key=True)
+    search_count = db.Column(db.Integer, default=0, nullable=False)
+
+
+class RollupCursor(db.Model):
+    """Highest source row id already folded into a rollup"""
+    
+    __tablename__ = 'rollup_cursors'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    last_id = db.Column(db.Integer, default=0, nullable=False)
+
+
+@event.listens_for(Itinerary.detailed_plan, 'set')
+def _invalidate_cached_plan(target, value, oldvalue, initiator):
+    """Drop the parsed plan as soon as a new detailed_plan is written"""
+    if target.id is not None:
+        plan_cache.pop(target.id)
+
+
 # Helper functions for database operations
 def create_user(name, email, password):
     """Create a new user"""
@@ -293,6 +442,65 @@ def get_user_by_id(user_id):
     """Get user by ID"""
     return db.session.get(User, int(user_id))
 
+def get_cached_user(user_id, stamp=None):
+    """Get user by ID, reusing a recent identity snapshot while it matches the session's credential stamp
+
+    A hit runs no query. The cache is per process, so a snapshot may predate a
+    password change made by another worker; such changes revoke the user's
+    sessions, and a session issued after them carries a stamp the old snapshot
+    does not match. When the database disagrees with the stamp, the session
+    predates the change and None is returned.
+    """
+    user_id = int(user_id)
+    snapshot = user_cache.get(user_id)
+    if snapshot is None or stamp is None or credential_stamp(snapshot['password_hash'], snapshot['is_active']) != stamp:
+        user = db.session.get(User, user_id)
+        if user is None:
+            user_cache.pop(user_id)
+            return None
+        user_cache.set(user_id, {attr.key: getattr(user, attr.key) for attr in User.__mapper__.column_attrs})
+        if stamp is not None and user.credential_stamp != stamp:
+            return None
+        return user
+    
+    # Rebuild a detached instance and attach it to the session without a SELECT,
+    # so the loaded user can still be modified and committed as usual
+    user = User.__mapper__.class_manager.new_instance()
+    for key, value in snapshot.items():
+        setattr(user, key, value)
+    make_transient_to_detached(user)
+    return db.session.merge(user, load=False)
+
+def invalidate_user_cache(user_id):
+    """Forget the cached identity snapshot for a user"""
+    if user_id is not None:
+        user_cache.pop(int(user_id))
+
+MOOD_ROLLUP_CURSOR = 'mood_rollups'
+
+def lock_rollup_cursor(name):
+    """Get the named rollup cursor, holding its row lock until the transaction ends"""
+    # A no-op UPDATE takes the row lock on every backend (and SQLite's write lock)
+    locked = db.session.query(RollupCursor).filter_by(name=name)\
+                       .update({RollupCursor.last_id: RollupCursor.last_id}, synchronize_session=False)
+    if not locked:
+        db.session.add(RollupCursor(name=name, last_id=0))
+        db.session.flush()
+    return db.session.query(RollupCursor.last_id).filter_by(name=name).scalar()
+
+def increment_rollup(model, keys, **deltas):
+    """Atomically add deltas to a rollup row, creating it if needed"""
+    updated = db.session.query(model).filter_by(**keys)\
+                        .update({getattr(model, column): getattr(model, column) + delta
+                                 for column, delta in deltas.items()}, synchronize_session=False)
+    if not updated:
+        row = model(**keys)
+        for column in ('search_count', 'rating_sum', 'rating_count'):
+            if hasattr(model, column):
+                setattr(row, column, deltas.get(column, 0))
+        db.session.add(row)
+        db.session.flush()
+
 def save_search_history(user_id, mood, query, result):
     """Save search history"""
     search = SearchHistory(user_id=user_id, mood=mood, query=query, result=result)
@@ -330,3 +538,54 @@ def get_user_search_history(user_id, limit=None):
     if limit:
         query = query.limit(limit)
     return query.all()
+
+# Listing queries: load only the columns summary views need, leaving the large
+# JSON and notes columns (result, detailed_plan, description, notes) in the database
+SEARCH_SUMMARY_COLUMNS = (
+    SearchHistory.id, SearchHistory.user_id, SearchHistory.mood, SearchHistory.query,
+    SearchHistory.timestamp, SearchHistory.rating, SearchHistory.is_favorite
+)
+
+ITINERARY_SUMMARY_COLUMNS = (
+    Itinerary.id, Itinerary.user_id, Itinerary.title, Itinerary.destination,
+    Itinerary.start_date, Itinerary.end_date, Itinerary.budget, Itinerary.duration_days,
+    Itinerary.mood_tag, Itinerary.is_completed, Itinerary.is_favorite,
+    Itinerary.created_at, Itinerary.updated_at
+)
+
+def get_user_itinerary_summaries(user_id, limit=None):
+    """Get itineraries for a user without loading their detailed plans"""
+    query = db.session.query(Itinerary).options(load_only(*ITINERARY_SUMMARY_COLUMNS))\
+                      .filter_by(user_id=user_id).order_by(Itinerary.created_at.desc())
+    if limit:
+        query = query.limit(limit)
+    return query.all()
+
+def get_user_search_summaries(user_id, limit=None):
+    """Get search history for a user without loading the stored results"""
+    query = db.session.query(SearchHistory).options(load_only(*SEARCH_SUMMARY_COLUMNS))\
+                      .filter_by(user_id=user_id).order_by(SearchHistory.timestamp.desc())
+    if limit:
+        query = query.limit(limit)
+    return query.all()
+
+# Cache validators: single aggregate queries that change whenever the listed rows do
+def get_itinerary_list_version(user_id):
+    """Get (row count, latest updated_at) for a user's itineraries"""
+    return db.session.query(func.count(Itinerary.id), func.max(Itinerary.updated_at))\
+                     .filter_by(user_id=user_id).one()
+
+def user_owns_itinerary(itinerary_id, user_id):
+    """Check that an itinerary exists and belongs to the user"""
+    return db.session.query(Itinerary.id).filter_by(id=itinerary_id, user_id=user_id).first() is not None
+
+def get_itinerary_version(itinerary_id, user_id):
+    """Get updated_at for one of a user's itineraries, or None if it doesn't exist (or was never stamped)"""
+    return db.session.query(Itinerary.updated_at).filter_by(id=itinerary_id, user_id=user_id).scalar()
+
+def get_search_history_version(user_id):
+    """Get (row count, latest timestamp, rating total, favorite count) for a user's searches"""
+    return db.session.query(func.count(SearchHistory.id), func.max(SearchHistory.timestamp),
+                            func.sum(SearchHistory.rating),
+                            func.sum(func.coalesce(SearchHistory.is_favorite, False).cast(db.Integer)))\
+                     .filter_by(user_id=user_id).one()
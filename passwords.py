@@ -0,0 +1,78 @@
+"""
+Password hashing for AI Travel Chatbot
+Hashing and verifying passwords is deliberately slow CPU work. Doing it on
+request threads let login bursts hold the GIL and starve every other request,
+so it now runs in a small pool of separate processes. Web threads just wait
+on the result.
+
+The hash method and work factor come from Config.PASSWORD_HASH_METHOD (any
+werkzeug method string, e.g. 'scrypt:32768:8:1' or 'pbkdf2:sha256:600000').
+Hashes made with other parameters still verify. needs_rehash() tells the
+login view to upgrade them.
+"""
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+_settings = {'method': 'scrypt', 'workers': 0}
+_state = {'pool': None, 'prefix': None}
+_lock = threading.Lock()
+
+
+def init_app(app):
+    """Apply the app's hashing settings; the process pool starts on first use"""
+    with _lock:
+        _settings['method'] = app.config['PASSWORD_HASH_METHOD']
+        _settings['workers'] = app.config['PASSWORD_HASH_WORKERS']
+        _state['prefix'] = None
+        if _state['pool'] is not None:
+            _state['pool'].shutdown(wait=False)
+            _state['pool'] = None
+
+
+def _get_pool():
+    """Process pool for hashing, created lazily so nothing is started before a fork"""
+    with _lock:
+        if _state['pool'] is None:
+            # spawn, not fork: children must not inherit the web process's threads and sockets
+            _state['pool'] = ProcessPoolExecutor(max_workers=_settings['workers'],
+                                                 mp_context=multiprocessing.get_context('spawn'))
+        return _state['pool']
+
+
+def _run(func, *args):
+    """Run func in the hashing pool, or inline if the pool is disabled or has died"""
+    if not _settings['workers']:
+        return func(*args)
+    try:
+        return _get_pool().submit(func, *args).result()
+    except BrokenProcessPool:
+        with _lock:
+            _state['pool'] = None
+        return func(*args)
+
+
+def hash_password(password):
+    """Hash a password with the configured method"""
+    return _run(generate_password_hash, password, _settings['method'])
+
+
+def verify_password(password_hash, password):
+    """Check a password against a stored hash of any supported method"""
+    return _run(check_password_hash, password_hash, password)
+
+
+def _method_prefix():
+    """The 'method:params' prefix the configured method writes, e.g. 'scrypt:32768:8:1'"""
+    if _state['prefix'] is None:
+        _state['prefix'] = _run(generate_password_hash, '', _settings['method']).split('$', 1)[0]
+    return _state['prefix']
+
+
+def needs_rehash(password_hash):
+    """True if a stored hash was made with a different method or work factor"""
+    return password_hash.split('$', 1)[0] != _method_prefix()
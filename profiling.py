@@ -0,0 +1,194 @@
+"""
+Request profiling for AI Travel Chatbot
+Profiles single requests on demand, in production, without a redeploy.
+
+On demand: send the PROFILE_TOKEN as an X-Profile header (or ?_profile=) and
+the request runs under cProfile. By default the response is replaced by a
+text summary; with X-Profile-Output: file (or ?_profile_output=file) the
+normal response is returned and the profile is saved under
+instance/profiles, named in the X-Profile-File header. X-Profile-Mode: sample
+(or ?_profile_mode=sample) uses the stack sampler instead of cProfile.
+
+Sampling: with PROFILE_SAMPLE_RATE = N, 1 in N requests to
+PROFILE_SAMPLE_ENDPOINTS is profiled in PROFILE_SAMPLE_MODE and saved to the
+same folder, which keeps only the newest PROFILE_KEEP files.
+
+Files are .prof (cProfile; open with snakeviz, or flameprof for a flame graph)
+or .folded (collapsed stacks from the sampler, for flamegraph.pl or
+speedscope).
+"""
+
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from flask import Response, g, request
+
+from structured_logging import log_event
+
+SUMMARY_LINES = 40
+
+
+class ProfileSession:
+    """One profiled request: cProfile on the request thread, or a stack sampler watching it"""
+
+    def __init__(self, mode='cprofile', interval=0.001):
+        self.mode = mode
+        self.interval = interval
+        self.profile = cProfile.Profile() if mode == 'cprofile' else None
+        self.thread = None
+        self.stacks = Counter()
+        self.samples = 0
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+        self._stopped = threading.Event()
+        self._sampler = None
+        if mode == 'sample':
+            self._sampler = threading.Thread(target=self._sample, name='profile-sampler', daemon=True)
+            self._sampler.start()
+
+    def enter(self):
+        """Start profiling the current thread"""
+        self.thread = threading.get_ident()
+        if self.profile is not None:
+            self.profile.enable()
+
+    def leave(self):
+        """Stop profiling; safe to call more than once"""
+        if self.profile is not None:
+            self.profile.disable()
+        self.thread = None
+
+    def stop(self):
+        """Finish the session; further calls are no-ops"""
+        if not self._stopped.is_set():
+            self.elapsed = time.perf_counter() - self.started
+            self._stopped.set()
+            if self._sampler is not None:
+                self._sampler.join()
+
+    def _sample(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread)
+            if frame is not None:
+                self.stacks[collapse_stack(frame)] += 1
+                self.samples += 1
+
+    def stats(self):
+        return pstats.Stats(self.profile, stream=io.StringIO())
+
+    def summary(self):
+        """Plain-text report of where the time went"""
+        if self.mode == 'cprofile':
+            stats = self.stats()
+            stats.stream = io.StringIO()
+            stats.sort_stats('cumulative').print_stats(SUMMARY_LINES)
+            return f"Profiled in {self.elapsed * 1000:.1f} ms\n" + stats.stream.getvalue()
+
+        inclusive = Counter()
+        for stack, count in self.stacks.items():
+            for name in set(stack.split(';')):
+                inclusive[name] += count
+        lines = [f"Profiled in {self.elapsed * 1000:.1f} ms, {self.samples} samples "
+                 f"every {self.interval * 1000:g} ms", '', f"{'samples':>8} {'%':>6}  function"]
+        for name, count in inclusive.most_common(SUMMARY_LINES):
+            lines.append(f"{count:>8} {count * 100 / max(self.samples, 1):>6.1f}  {name}")
+        return '\n'.join(lines) + '\n'
+
+    def save(self, path_without_extension):
+        """Write the profile file and return its path"""
+        if self.mode == 'cprofile':
+            path = path_without_extension + '.prof'
+            self.stats().dump_stats(path)
+        else:
+            path = path_without_extension + '.folded'
+            with open(path, 'w', encoding='utf-8') as f:
+                for stack, count in self.stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+        return path
+
+
+def collapse_stack(frame):
+    """Render a frame's call stack as 'outer;...;inner' for flame graphs"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+def prune_profiles(directory, keep):
+    """Delete all but the newest keep files in the profile directory"""
+    paths = [os.path.join(directory, name) for name in os.listdir(directory)]
+    paths.sort(key=os.path.getmtime, reverse=True)
+    for path in paths[keep:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def requested_option(name, default):
+    return request.headers.get(f'X-Profile-{name.capitalize()}') or request.args.get(f'_profile_{name}') or default
+
+
+def init_app(app):
+    """Profile requests that carry the profiling token, plus 1 in PROFILE_SAMPLE_RATE sampled ones"""
+    token = app.config['PROFILE_TOKEN']
+    sample_rate = app.config['PROFILE_SAMPLE_RATE']
+    sample_endpoints = set(app.config['PROFILE_SAMPLE_ENDPOINTS'])
+    directory = os.path.join(app.instance_path, app.config['PROFILE_DIR'])
+    if not token and not sample_rate:
+        return
+
+    @app.before_request
+    def start_profile():
+        supplied = request.headers.get('X-Profile') or request.args.get('_profile')
+        if token and supplied and hmac.compare_digest(supplied.encode(), token.encode()):
+            mode, output = requested_option('mode', 'cprofile'), requested_option('output', 'summary')
+        elif sample_rate and request.endpoint in sample_endpoints and random.random() < 1 / sample_rate:
+            mode, output = app.config['PROFILE_SAMPLE_MODE'], 'file'
+        else:
+            return None
+
+        session = ProfileSession('sample' if mode == 'sample' else 'cprofile', app.config['PROFILE_SAMPLE_INTERVAL'])
+        g.profile_session = session
+        g.profile_output = output
+        session.enter()
+        return None
+
+    @app.after_request
+    def finish_profile(response):
+        session = g.get('profile_session')
+        if session is None:
+            return response
+        session.leave()
+        session.stop()
+
+        if g.profile_output == 'summary':
+            return Response(session.summary(), mimetype='text/plain',
+                            headers={'X-Profile-Status': str(response.status_code), 'Cache-Control': 'no-store'})
+
+        os.makedirs(directory, exist_ok=True)
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{request.endpoint}-{os.getpid()}-{random.randrange(16 ** 6):06x}"
+        path = session.save(os.path.join(directory, name))
+        prune_profiles(directory, app.config['PROFILE_KEEP'])
+        log_event('profile_saved', file=os.path.basename(path), elapsed_ms=round(session.elapsed * 1000, 1))
+        if request.headers.get('X-Profile') or request.args.get('_profile'):
+            response.headers['X-Profile-File'] = os.path.basename(path)
+        return response
+
+    @app.teardown_request
+    def end_profile(exc):
+        session = g.pop('profile_session', None)
+        if session is not None:
+            session.leave()
+            session.stop()
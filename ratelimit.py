@@ -0,0 +1,179 @@
+"""
+Admission control for AI Travel Chatbot
+Token-bucket rate limiting of POSTs per user (or client IP when logged out)
+with per-endpoint budgets from Config.RATELIMITS, plus a global cap on in-flight
+requests. Both reject immediately with 429/503 rather than queueing.
+
+Bucket state lives in a pluggable store: the in-memory store is per process,
+while the SQLite store lets every worker on a host share the same buckets.
+"""
+
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+
+from flask import g, jsonify, request
+from flask_login import current_user
+
+from sqlite_local import ThreadLocalSQLite
+from structured_logging import log_event
+
+
+class MemoryBucketStore:
+    """Token buckets kept in this process, split into stripes that each have their own lock
+
+    Each bucket records when it will be full again (from its own capacity and
+    rate), and a sweep every sweep_interval seconds forgets the ones that are:
+    a full bucket behaves exactly like a new one.
+    """
+
+    def __init__(self, stripes=16, sweep_interval=60):
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._stripes = [{} for _ in range(stripes)]
+        self.sweep_interval = sweep_interval
+        self._next_sweep = time.monotonic() + sweep_interval
+        self._sweep_lock = threading.Lock()
+
+    def consume(self, key, capacity, rate, now=None):
+        """Take one token; return (allowed, seconds until a token is available)"""
+        now = time.monotonic() if now is None else now
+        stripe = hash(key) % len(self._locks)
+        with self._locks[stripe]:
+            buckets = self._stripes[stripe]
+            tokens, updated, _ = buckets.get(key, (capacity, now, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            buckets[key] = (tokens, now, now + (capacity - tokens) / rate)
+        if now >= self._next_sweep:
+            self.sweep(now)
+        return allowed, 0 if allowed else (1 - tokens) / rate
+
+    def sweep(self, now=None):
+        """Forget buckets that have refilled completely"""
+        now = time.monotonic() if now is None else now
+        if not self._sweep_lock.acquire(blocking=False):
+            return  # Another thread is already sweeping
+        try:
+            self._next_sweep = now + self.sweep_interval
+            for lock, buckets in zip(self._locks, self._stripes):
+                with lock:
+                    for key in [key for key, (_, _, full_at) in buckets.items() if full_at <= now]:
+                        del buckets[key]
+        finally:
+            self._sweep_lock.release()
+
+    def __len__(self):
+        return sum(len(buckets) for buckets in self._stripes)
+
+
+class SQLiteBucketStore:
+    """Token buckets in a local SQLite file shared by all workers on the host
+
+    Rows record when their bucket will be full again, and each process deletes
+    the full ones every sweep_interval seconds.
+    """
+
+    def __init__(self, path, sweep_interval=60):
+        self.path = path
+        self.sweep_interval = sweep_interval
+        self._next_sweep = time.time() + sweep_interval
+        # Losing the last writes in a crash only refills some buckets early
+        self._db = ThreadLocalSQLite(path, timeout=1, synchronous='OFF')
+        conn = sqlite3.connect(path, timeout=1)
+        try:
+            conn.execute('CREATE TABLE IF NOT EXISTS token_buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, '
+                         'updated REAL NOT NULL, full_at REAL NOT NULL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS token_buckets_full_at ON token_buckets (full_at)')
+            conn.commit()
+        finally:
+            conn.close()
+
+    def consume(self, key, capacity, rate, now=None):
+        """Take one token; return (allowed, seconds until a token is available)"""
+        # Wall-clock time, since monotonic clocks are not comparable across processes
+        now = time.time() if now is None else now
+        conn = self._db.connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT tokens, updated FROM token_buckets WHERE key = ?', (key,)).fetchone()
+            tokens, updated = row if row else (capacity, now)
+            tokens = min(capacity, tokens + max(0, now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            conn.execute('INSERT OR REPLACE INTO token_buckets (key, tokens, updated, full_at) VALUES (?, ?, ?, ?)',
+                         (key, tokens, now, now + (capacity - tokens) / rate))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        if now >= self._next_sweep:
+            self.sweep(now)
+        return allowed, 0 if allowed else (1 - tokens) / rate
+
+    def sweep(self, now=None):
+        """Delete buckets that have refilled completely"""
+        now = time.time() if now is None else now
+        self._next_sweep = now + self.sweep_interval
+        self._db.connect().execute('DELETE FROM token_buckets WHERE full_at <= ?', (now,))
+
+
+def create_store(app):
+    """Build the bucket store named by RATELIMIT_STORAGE ('memory' or 'sqlite')"""
+    if app.config['RATELIMIT_STORAGE'] == 'sqlite':
+        os.makedirs(app.instance_path, exist_ok=True)
+        return SQLiteBucketStore(os.path.join(app.instance_path, app.config['RATELIMIT_SQLITE_FILE']))
+    return MemoryBucketStore()
+
+
+def client_key():
+    """Identify the caller: user id when logged in, otherwise the remote address"""
+    if current_user.is_authenticated:
+        return f"user:{current_user.id}"
+    return f"ip:{request.remote_addr}"
+
+
+def reject(status, message, retry_after):
+    """Fast rejection response with a Retry-After hint"""
+    body = jsonify({'error': message}) if request.path.startswith('/api/') else message
+    return body, status, {'Retry-After': str(max(1, math.ceil(retry_after)))}
+
+
+def init_app(app):
+    """Register the concurrency cap and rate limit checks"""
+    store = create_store(app)
+    max_concurrent = app.config['MAX_CONCURRENT_REQUESTS']
+    slots = threading.BoundedSemaphore(max_concurrent) if max_concurrent else None
+    app.extensions['ratelimit'] = store
+
+    @app.before_request
+    def admit_request():
+        if slots is not None and request.endpoint != 'static':
+            if not slots.acquire(blocking=False):
+                return reject(503, 'Server is busy, please try again shortly', 1)
+            g.holds_request_slot = True
+
+        if not app.config['RATELIMIT_ENABLED']:
+            return None
+        # Only requests that write are budgeted; page views stay unlimited
+        limit = app.config['RATELIMITS'].get(request.endpoint)
+        if limit is None or request.method in ('GET', 'HEAD', 'OPTIONS'):
+            return None
+
+        requests_allowed, period = limit
+        allowed, retry_after = store.consume(f"{request.endpoint}:{client_key()}",
+                                             requests_allowed, requests_allowed / period)
+        if not allowed:
+            log_event('rate_limited', logging.WARNING, client=client_key())
+            return reject(429, 'Too many requests, please slow down', retry_after)
+        return None
+
+    @app.teardown_request
+    def release_request_slot(exc):
+        if g.pop('holds_request_slot', False):
+            slots.release()
@@ -0,0 +1,219 @@
+"""
+Search history retention for AI Travel Chatbot
+Archives expired search_history rows to gzipped NDJSON files, prunes them in
+small batches and restores them from those archives on demand. Searches the
+mood rollups (analytics.py) have not folded in yet are kept until they are.
+
+Usage:
+    python retention.py prune [--days 180] [--max-per-user 500] [--dry-run]
+    python retention.py restore <archive.ndjson.gz> [<archive.ndjson.gz> ...]
+"""
+
+import argparse
+import gzip
+import json
+import os
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import and_, insert, inspect, or_
+
+from models import db, User, SearchHistory, RollupCursor, MOOD_ROLLUP_CURSOR
+
+ARCHIVE_COLUMNS = [column.name for column in SearchHistory.__table__.columns]
+
+
+def _not_favorite():
+    """Favorites are never pruned"""
+    return or_(SearchHistory.is_favorite.is_(False), SearchHistory.is_favorite.is_(None))
+
+
+def _rollup_cursor_id():
+    """The rollup cursor's search id, or None when mood rollups are not in use"""
+    if not inspect(db.engine).has_table(RollupCursor.__tablename__):
+        return None
+    return db.session.query(RollupCursor.last_id).filter_by(name=MOOD_ROLLUP_CURSOR).scalar()
+
+
+def _expired_condition(user_id, cutoff, max_per_user, cursor_id=None):
+    """Build the filter selecting one user's expired, non-favorite searches"""
+    expired = SearchHistory.timestamp < cutoff
+
+    if max_per_user:
+        # First row past the cap, newest first; it and everything older overflow
+        boundary = db.session.query(SearchHistory.timestamp, SearchHistory.id)\
+                             .filter(SearchHistory.user_id == user_id, _not_favorite())\
+                             .order_by(SearchHistory.timestamp.desc(), SearchHistory.id.desc())\
+                             .offset(max_per_user).first()
+        if boundary:
+            expired = or_(
+                expired,
+                SearchHistory.timestamp < boundary.timestamp,
+                and_(SearchHistory.timestamp == boundary.timestamp, SearchHistory.id <= boundary.id)
+            )
+
+    condition = and_(SearchHistory.user_id == user_id, _not_favorite(), expired)
+    if cursor_id is not None:
+        # Rows past the cursor are not counted yet, and the row at it keeps its id taken:
+        # tables created without AUTOINCREMENT hand a deleted highest id to the next insert,
+        # which the cursor would then skip
+        condition = and_(condition, SearchHistory.id < cursor_id)
+    return condition
+
+
+def _serialize_row(row):
+    """Convert a search_history row to a JSON-safe dictionary"""
+    record = {}
+    for name in ARCHIVE_COLUMNS:
+        value = getattr(row, name)
+        record[name] = value.isoformat() if isinstance(value, datetime) else value
+    return record
+
+
+def _deserialize_row(record):
+    """Convert an archived record back to column values"""
+    row = {name: record.get(name) for name in ARCHIVE_COLUMNS}
+    if row['timestamp']:
+        row['timestamp'] = datetime.fromisoformat(row['timestamp'])
+    return row
+
+
+def prune_search_history(days=None, max_per_user=None, batch_size=None, dry_run=False):
+    """Archive and delete expired search history, one bounded batch at a time"""
+    days = current_app.config['SEARCH_HISTORY_RETENTION_DAYS'] if days is None else days
+    max_per_user = current_app.config['SEARCH_HISTORY_MAX_PER_USER'] if max_per_user is None else max_per_user
+    batch_size = batch_size or current_app.config['RETENTION_BATCH_SIZE']
+    cutoff = datetime.utcnow() - timedelta(days=days)
+
+    archive_dir = os.path.join(current_app.instance_path, current_app.config['SEARCH_HISTORY_ARCHIVE_DIR'])
+    # Unique per run, so two prunes in the same second never share (and truncate) an archive
+    archive_path = os.path.join(archive_dir, f"search_history-{datetime.utcnow():%Y%m%dT%H%M%S.%f}-"
+                                             f"{os.getpid()}.ndjson.gz")
+    archive = None
+    stats = {'users': 0, 'archived': 0, 'deleted': 0, 'archive': None}
+
+    try:
+        cursor_id = _rollup_cursor_id()
+        user_ids = [user_id for (user_id,) in db.session.query(SearchHistory.user_id).distinct()]
+        for user_id in user_ids:
+            condition = _expired_condition(user_id, cutoff, max_per_user, cursor_id)
+
+            if dry_run:
+                expired_count = db.session.query(SearchHistory.id).filter(condition).count()
+                stats['archived'] += expired_count
+                stats['users'] += 1 if expired_count else 0
+                continue
+
+            last_id = 0
+            user_touched = False
+            while True:
+                rows = db.session.query(SearchHistory).filter(condition, SearchHistory.id > last_id)\
+                                 .order_by(SearchHistory.id).limit(batch_size).all()
+                if not rows:
+                    break
+
+                if archive is None:
+                    os.makedirs(archive_dir, exist_ok=True)
+                    archive = gzip.open(archive_path, 'xt', encoding='utf-8')
+                    stats['archive'] = archive_path
+
+                for row in rows:
+                    archive.write(json.dumps(_serialize_row(row)) + '\n')
+                # Make the batch durable before the rows disappear from the database
+                archive.flush()
+                os.fsync(archive.fileno())
+
+                batch_ids = [row.id for row in rows]
+                last_id = batch_ids[-1]
+                db.session.expunge_all()
+                deleted = db.session.query(SearchHistory).filter(SearchHistory.id.in_(batch_ids))\
+                                    .delete(synchronize_session=False)
+                db.session.commit()
+
+                stats['archived'] += len(batch_ids)
+                stats['deleted'] += deleted
+                user_touched = True
+
+            stats['users'] += 1 if user_touched else 0
+    except Exception:
+        db.session.rollback()
+        raise
+    finally:
+        if archive is not None:
+            archive.close()
+
+    return stats
+
+
+def restore_search_history(archive_path, batch_size=None):
+    """Re-insert archived rows, skipping ids that already exist or users that are gone"""
+    batch_size = batch_size or current_app.config['RETENTION_BATCH_SIZE']
+    stats = {'restored': 0, 'skipped': 0}
+
+    def flush(batch):
+        ids = [row['id'] for row in batch]
+        existing = {row_id for (row_id,) in db.session.query(SearchHistory.id).filter(SearchHistory.id.in_(ids))}
+        user_ids = {row['user_id'] for row in batch}
+        known_users = {user_id for (user_id,) in db.session.query(User.id).filter(User.id.in_(user_ids))}
+
+        rows = [row for row in batch if row['id'] not in existing and row['user_id'] in known_users]
+        if rows:
+            db.session.execute(insert(SearchHistory), rows)
+            db.session.commit()
+        stats['restored'] += len(rows)
+        stats['skipped'] += len(batch) - len(rows)
+
+    try:
+        batch = []
+        with gzip.open(archive_path, 'rt', encoding='utf-8') as archive:
+            for line in archive:
+                if not line.strip():
+                    continue
+                batch.append(_deserialize_row(json.loads(line)))
+                if len(batch) >= batch_size:
+                    flush(batch)
+                    batch = []
+        if batch:
+            flush(batch)
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prune and restore search history')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    prune_parser = subparsers.add_parser('prune', help='Archive and delete expired search history')
+    prune_parser.add_argument('--days', type=int, help='Maximum age in days of non-favorite searches')
+    prune_parser.add_argument('--max-per-user', type=int, help='Maximum non-favorite searches kept per user (0 disables)')
+    prune_parser.add_argument('--batch-size', type=int, help='Rows archived and deleted per transaction')
+    prune_parser.add_argument('--dry-run', action='store_true', help='Only report how many rows would be pruned')
+
+    restore_parser = subparsers.add_parser('restore', help='Restore search history from archive files')
+    restore_parser.add_argument('archives', nargs='+', help='Archive files written by prune')
+    restore_parser.add_argument('--batch-size', type=int, help='Rows inserted per transaction')
+
+    args = parser.parse_args()
+
+    from app import create_app
+
+    with create_app().app_context():
+        if args.command == 'prune':
+            stats = prune_search_history(args.days, args.max_per_user, args.batch_size, args.dry_run)
+            if args.dry_run:
+                print(f"ℹ️  {stats['archived']} searches from {stats['users']} users would be pruned")
+            else:
+                print(f"✅ Pruned {stats['deleted']} searches from {stats['users']} users")
+                if stats['archive']:
+                    print(f"📦 Archive: {stats['archive']}")
+        else:
+            for archive_path in args.archives:
+                stats = restore_search_history(archive_path, args.batch_size)
+                print(f"✅ Restored {stats['restored']} searches from {archive_path} ({stats['skipped']} skipped)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+"""
+Server-side sessions for AI Travel Chatbot
+Replaces Flask's signed-cookie sessions. The cookie now carries only a short
+random session id. Session data lives in a local SQLite file in the instance
+folder, shared by all workers on the host, with an LRU of decoded sessions in
+front of it.
+
+On each request a session is resolved by a primary-key lookup of its version
+number. When the cached copy is current it is used as is, without reading or
+decoding the stored blob. A session is written back only when it changed, or
+when its expiry is more than halfway through and needs to slide forward.
+Writes are compare-and-set on the version read at the start of the request, so
+two workers can never store different data under the same version.
+
+Each row also records the logged-in user, so revoke_user() can end all of a
+user's sessions at once, on every worker, when their password or active flag
+changes.
+"""
+
+import copy
+import os
+import random
+import re
+import secrets
+import sqlite3
+import time
+
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SecureCookieSession, SessionInterface
+
+from caching import LRUCache
+from sqlite_local import ThreadLocalSQLite
+
+SID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{32}$')
+
+
+class ServerSideSession(SecureCookieSession):
+    """Session dict that remembers its id, stored version, expiry and the user it was opened for"""
+
+    def __init__(self, initial=None, sid=None, version=0, expires=0.0):
+        super().__init__(initial)
+        self.sid = sid
+        self.version = version
+        self.expires = expires
+        self.new = sid is None
+        # Read without marking the session accessed
+        self.opened_user_id = dict.get(self, '_user_id')
+
+
+class SQLiteSessionStore:
+    """Session rows (sid, data, version, expires, user_id) in a local SQLite file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._db = ThreadLocalSQLite(path, timeout=5, synchronous='NORMAL')
+        conn = sqlite3.connect(path, timeout=5)
+        try:
+            conn.execute('CREATE TABLE IF NOT EXISTS sessions (sid TEXT PRIMARY KEY, data BLOB NOT NULL, '
+                         'version INTEGER NOT NULL, expires REAL NOT NULL, user_id TEXT)')
+            columns = [row[1] for row in conn.execute('PRAGMA table_info(sessions)')]
+            if 'user_id' not in columns:
+                conn.execute('ALTER TABLE sessions ADD COLUMN user_id TEXT')
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_sessions_user_id ON sessions (user_id)')
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get_version(self, sid):
+        """Return (version, expires) for a session, or None"""
+        return self._db.connect().execute('SELECT version, expires FROM sessions WHERE sid = ?', (sid,)).fetchone()
+
+    def load(self, sid):
+        """Return (data, version, expires) for a session, or None"""
+        return self._db.connect().execute('SELECT data, version, expires FROM sessions WHERE sid = ?',
+                                          (sid,)).fetchone()
+
+    def insert(self, sid, data, expires, user_id=None):
+        """Store a new session at version 1"""
+        self._db.connect().execute('INSERT INTO sessions (sid, data, version, expires, user_id) '
+                                   'VALUES (?, ?, 1, ?, ?)', (sid, data, expires, user_id))
+        return 1
+
+    def update(self, sid, data, version, expires, user_id=None):
+        """Replace a session still at the given version; return its new version, or None if another write won"""
+        row = self._db.connect().execute('UPDATE sessions SET data = ?, version = version + 1, expires = ?, '
+                                         'user_id = ? WHERE sid = ? AND version = ? RETURNING version',
+                                         (data, expires, user_id, sid, version)).fetchone()
+        return row[0] if row else None
+
+    def touch(self, sid, expires):
+        self._db.connect().execute('UPDATE sessions SET expires = ? WHERE sid = ?', (expires, sid))
+
+    def delete(self, sid):
+        self._db.connect().execute('DELETE FROM sessions WHERE sid = ?', (sid,))
+
+    def delete_user(self, user_id):
+        self._db.connect().execute('DELETE FROM sessions WHERE user_id = ?', (str(user_id),))
+
+    def purge_expired(self, now):
+        self._db.connect().execute('DELETE FROM sessions WHERE expires < ?', (now,))
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """Look sessions up by an opaque cookie id; cache decoded data per process"""
+
+    session_class = ServerSideSession
+    serializer = TaggedJSONSerializer()
+
+    def __init__(self, store, cache_size=1024, purge_probability=0.01):
+        self.store = store
+        self.cache = LRUCache(maxsize=cache_size)
+        self.purge_probability = purge_probability
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if not sid or not SID_PATTERN.match(sid):
+            return self.session_class()
+
+        row = self.store.get_version(sid)
+        now = time.time()
+        if row is None or row[1] < now:
+            self.cache.pop(sid)
+            return self.session_class()
+
+        version, expires = row
+        cached = self.cache.get(sid)
+        if cached is None or cached[0] != version:
+            loaded = self.store.load(sid)
+            if loaded is None:
+                return self.session_class()
+            cached = (loaded[1], self.serializer.loads(loaded[0]))
+            self.cache.set(sid, cached)
+            version = loaded[1]
+        # Each request gets its own copy, since views mutate nested values like the flash list
+        return self.session_class(copy.deepcopy(cached[1]), sid=sid, version=version, expires=expires)
+
+    def revoke_user(self, user_id):
+        """End every session logged in as the user; other workers see the rows gone on their next request"""
+        self.store.delete_user(user_id)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        lifetime = app.permanent_session_lifetime.total_seconds()
+        now = time.time()
+
+        if session.accessed:
+            response.vary.add('Cookie')
+
+        if not session:
+            if not session.new:
+                self.store.delete(session.sid)
+                self.cache.pop(session.sid)
+                response.delete_cookie(name, domain=domain, path=path,
+                                       secure=self.get_cookie_secure(app),
+                                       samesite=self.get_cookie_samesite(app),
+                                       httponly=self.get_cookie_httponly(app))
+            return
+
+        sid = session.sid
+        if not session.new and dict.get(session, '_user_id') != session.opened_user_id:
+            # Logging in or out gets a fresh id, so an id planted in the browser beforehand is worthless
+            self.store.delete(sid)
+            self.cache.pop(sid)
+            sid = None
+        if session.modified or sid is None:
+            data = dict(session)
+            user_id = data.get('_user_id')
+            if sid is None:
+                sid = secrets.token_urlsafe(24)
+                version = self.store.insert(sid, self.serializer.dumps(data), now + lifetime, user_id)
+            else:
+                version = self.store.update(sid, self.serializer.dumps(data), session.version, now + lifetime,
+                                            user_id)
+            if version is None:
+                # A concurrent request wrote first and its data stands; every cache reloads it
+                self.cache.pop(sid)
+            else:
+                self.cache.set(sid, (version, copy.deepcopy(data)))
+            if random.random() < self.purge_probability:
+                self.store.purge_expired(now)
+        elif session.expires - now < lifetime / 2:
+            # Slide the expiry forward only once half of it is used up
+            self.store.touch(sid, now + lifetime)
+        else:
+            return
+
+        # The id only changes with the logged-in user, otherwise the cookie is resent when its expiry moves
+        if sid != session.sid or session.permanent:
+            response.set_cookie(name, sid, expires=self.get_expiration_time(app, session),
+                                httponly=self.get_cookie_httponly(app), domain=domain, path=path,
+                                secure=self.get_cookie_secure(app), samesite=self.get_cookie_samesite(app),
+                                partitioned=self.get_cookie_partitioned(app))
+
+
+def init_app(app):
+    """Serve sessions from the server-side store when SERVER_SESSIONS is on"""
+    if not app.config['SERVER_SESSIONS']:
+        return
+    os.makedirs(app.instance_path, exist_ok=True)
+    store = SQLiteSessionStore(os.path.join(app.instance_path, app.config['SESSION_STORE_FILE']))
+    app.session_interface = ServerSideSessionInterface(store, app.config['SESSION_CACHE_SIZE'])
@@ -0,0 +1,185 @@
+"""
+Per-request SQL statistics for AI Travel Chatbot
+Counts the queries each request runs and the time spent in them, using
+SQLAlchemy engine events, and flags statements that run many times with the
+same shape (e.g. a COUNT per user in a loop over User.to_dict()) as a likely
+N+1 pattern.
+
+Results go to X-SQL-* response headers in debug mode, to the
+db_* metrics on /metrics, and to a warning log line when a request looks like
+an N+1.
+
+In tests, max_queries() fails when a block runs too many queries:
+    with max_queries(5):
+        client.get('/dashboard')
+
+Usage (prints query counts for the main pages as a logged-in user):
+    python sql_stats.py
+"""
+
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+import metrics
+from structured_logging import log_event
+
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+metrics.define('db_queries_per_request', 'histogram', 'SQL queries run by one request, by endpoint', QUERY_BUCKETS)
+metrics.define('db_query_seconds_total', 'counter', 'Time spent in SQL queries, by endpoint')
+metrics.define('db_repeated_query_requests_total', 'counter', 'Requests that repeated a statement shape, by endpoint')
+
+_current = ContextVar('sql_stats', default=None)
+_listening = False
+
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+PLACEHOLDER_LISTS = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+WHITESPACE = re.compile(r'\s+')
+
+
+def statement_shape(statement):
+    """Statement text with literals and IN-list lengths normalised away"""
+    shape = LITERALS.sub('?', statement)
+    shape = PLACEHOLDER_LISTS.sub('(?)', shape)
+    return WHITESPACE.sub(' ', shape).strip()
+
+
+class QueryStats:
+    """Queries seen while this object was the active collector"""
+
+    def __init__(self, parent=None):
+        self.parent = parent
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes = Counter()
+        self.statements = []
+
+    def record(self, statement, seconds):
+        self.count += 1
+        self.seconds += seconds
+        self.shapes[statement_shape(statement)] += 1
+        self.statements.append(statement)
+        if self.parent is not None:
+            self.parent.record(statement, seconds)
+
+    def repeated(self, threshold):
+        """[(shape, times)] for statement shapes run at least threshold times"""
+        return [(shape, times) for shape, times in self.shapes.most_common() if times >= threshold]
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault('sql_stats_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is not None and conn.info.get('sql_stats_started'):
+        stats.record(statement, time.perf_counter() - conn.info['sql_stats_started'].pop())
+
+
+def listen():
+    """Attach the engine event listeners once per process"""
+    global _listening
+    if not _listening:
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        _listening = True
+
+
+@contextmanager
+def collect_queries():
+    """Collect the queries run inside the block, including any requests it makes"""
+    listen()
+    stats = QueryStats(parent=_current.get())
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def max_queries(limit):
+    """Test helper: fail if the block runs more than limit queries"""
+    with collect_queries() as stats:
+        yield stats
+    if stats.count > limit:
+        listing = '\n'.join(f"  {statement}" for statement in stats.statements)
+        raise AssertionError(f"Expected at most {limit} queries, ran {stats.count}:\n{listing}")
+
+
+def init_app(app):
+    """Collect SQL statistics for every request"""
+    if not app.config['SQL_STATS_ENABLED']:
+        return
+    listen()
+    threshold = app.config['SQL_REPEATED_QUERY_THRESHOLD']
+
+    @app.before_request
+    def start_query_stats():
+        stats = QueryStats(parent=_current.get())
+        g.sql_stats = stats
+        g.sql_stats_token = _current.set(stats)
+
+    @app.after_request
+    def report_query_stats(response):
+        stats = g.get('sql_stats')
+        if stats is None:
+            return response
+        endpoint = request.endpoint or 'unmatched'
+        repeated = stats.repeated(threshold)
+
+        metrics.observe('db_queries_per_request', stats.count, endpoint=endpoint)
+        if stats.count:
+            metrics.inc('db_query_seconds_total', stats.seconds, endpoint=endpoint)
+        if repeated:
+            metrics.inc('db_repeated_query_requests_total', endpoint=endpoint)
+            shape, times = repeated[0]
+            log_event('repeated_query', logging.WARNING, times=times, statement=shape[:200])
+
+        if app.debug:
+            response.headers['X-SQL-Queries'] = str(stats.count)
+            response.headers['X-SQL-Time-ms'] = f"{stats.seconds * 1000:.2f}"
+            if repeated:
+                response.headers['X-SQL-Repeated'] = '; '.join(f"{times}x {shape[:120]}"
+                                                               for shape, times in repeated[:3])
+        return response
+
+    @app.teardown_request
+    def end_query_stats(exc):
+        token = g.pop('sql_stats_token', None)
+        if token is not None:
+            _current.reset(token)
+
+
+if __name__ == '__main__':
+    import os
+    import tempfile
+
+    from app import create_app, initialize_database
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(tmp, 'sql_stats.db'),
+                          'RATELIMIT_ENABLED': False, 'PAGE_CACHE_TTL': 0})
+        with app.app_context():
+            initialize_database()
+        client = app.test_client()
+        client.post('/login', data={'email': 'demo@paradiseride.com', 'password': 'demo123'})
+        client.post('/api/chat', json={'message': 'I feel adventurous'})
+
+        print(f"{'Route':<28}{'Queries':>9}{'Time (ms)':>11}  Repeated")
+        for path in ['/', '/chatbot', '/dashboard', '/api/itineraries', '/api/search_history', '/api/analytics/moods']:
+            with collect_queries() as stats:
+                status = client.get(path).status_code
+            repeated = stats.repeated(app.config['SQL_REPEATED_QUERY_THRESHOLD'])
+            flag = f"⚠️ {repeated[0][1]}x {repeated[0][0][:60]}" if repeated else ''
+            print(f"{path + ' (' + str(status) + ')':<28}{stats.count:>9}{stats.seconds * 1000:>11.2f}  {flag}")
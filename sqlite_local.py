@@ -0,0 +1,30 @@
+"""
+Per-thread connections to the small SQLite files in the instance folder
+Used by the server-side session store and the shared rate limit buckets.
+"""
+
+import sqlite3
+import threading
+
+
+class ThreadLocalSQLite:
+    """Autocommit WAL connections to one SQLite file, one per thread
+
+    Connections are opened per thread on first use, so none leak across a fork.
+    """
+
+    def __init__(self, path, timeout=5, synchronous='NORMAL'):
+        self.path = path
+        self.timeout = timeout
+        self.synchronous = synchronous
+        self._local = threading.local()
+
+    def connect(self):
+        """Return this thread's connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(f'PRAGMA synchronous={self.synchronous}')
+            self._local.conn = conn
+        return conn
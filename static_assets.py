@@ -0,0 +1,126 @@
+"""
+Static asset serving for AI Travel Chatbot
+Fingerprints static files with a content hash so they can be cached forever,
+and serves the precompressed .br/.gz copies written by build_assets.py when the
+client accepts them and they are at least as new as the original file.
+
+Templates link assets with asset_url('static', filename=...), a drop-in for
+url_for that emits e.g. /static/css/styles.1a2b3c4d5e.css.
+"""
+
+import hashlib
+import json
+import mimetypes
+import os
+
+from flask import current_app, send_from_directory, url_for
+
+from compression import ENCODING_SUFFIXES, available_encodings, negotiate_encoding
+
+
+def fingerprint(filename, data):
+    """Insert a content hash before the file extension"""
+    stem, extension = os.path.splitext(filename)
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:10]}{extension}"
+
+
+def build_manifest(static_folder, manifest_name='manifest.json'):
+    """Map every original static file to its fingerprinted name"""
+    manifest = {}
+    for root, _, files in os.walk(static_folder):
+        for name in sorted(files):
+            if name.endswith(tuple(ENCODING_SUFFIXES.values())):
+                continue
+            path = os.path.join(root, name)
+            filename = os.path.relpath(path, static_folder).replace(os.sep, '/')
+            if filename == manifest_name:
+                continue
+            with open(path, 'rb') as f:
+                manifest[filename] = fingerprint(filename, f.read())
+    return manifest
+
+
+def load_manifest(app):
+    """Read the manifest written by build_assets.py, or hash the files now if there is none"""
+    manifest_name = app.config['ASSET_MANIFEST']
+    try:
+        with open(os.path.join(app.static_folder, manifest_name), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return build_manifest(app.static_folder, manifest_name)
+
+
+def get_manifest():
+    """Manifest for the current app; rebuilt on every call in debug mode so edits show up"""
+    state = current_app.extensions['static_assets']
+    if current_app.debug:
+        state['manifest'] = build_manifest(current_app.static_folder, current_app.config['ASSET_MANIFEST'])
+        state['originals'] = {hashed: original for original, hashed in state['manifest'].items()}
+    return state
+
+
+def asset_url(endpoint, **values):
+    """url_for that swaps static filenames for their fingerprinted names"""
+    if endpoint == 'static' and 'filename' in values:
+        values['filename'] = get_manifest()['manifest'].get(values['filename'], values['filename'])
+    return url_for(endpoint, **values)
+
+
+def find_precompressed(static_folder, filename):
+    """Return (encoding, compressed filename) for the best usable precompressed copy, or None"""
+    source = os.path.join(static_folder, filename)
+    try:
+        source_mtime = os.stat(source).st_mtime
+    except OSError:
+        return None
+
+    encodings = []
+    for encoding in available_encodings():
+        candidate = filename + ENCODING_SUFFIXES[encoding]
+        try:
+            if os.stat(os.path.join(static_folder, candidate)).st_mtime >= source_mtime:
+                encodings.append(encoding)
+        except OSError:
+            continue
+    if not encodings:
+        return None
+
+    encoding = negotiate_encoding(encodings)
+    return (encoding, filename + ENCODING_SUFFIXES[encoding]) if encoding else None
+
+
+def init_app(app):
+    """Replace the static file view with one that resolves fingerprints and prefers precompressed copies"""
+    compressible = set(app.config['COMPRESS_MIMETYPES'])
+    manifest = load_manifest(app)
+    app.extensions['static_assets'] = {
+        'manifest': manifest,
+        'originals': {hashed: original for original, hashed in manifest.items()}
+    }
+    app.jinja_env.globals['asset_url'] = asset_url
+
+    def static(filename):
+        original = get_manifest()['originals'].get(filename)
+        if original is not None:
+            filename = original
+        mimetype = mimetypes.guess_type(filename)[0]
+        # A fingerprinted URL always names the same bytes, so it can be cached for good
+        max_age = app.config['ASSET_MAX_AGE'] if original is not None else app.get_send_file_max_age(filename)
+
+        precompressed = None
+        if app.config['COMPRESS_ENABLED'] and mimetype in compressible:
+            precompressed = find_precompressed(app.static_folder, filename)
+        if precompressed is None:
+            response = send_from_directory(app.static_folder, filename, max_age=max_age)
+        else:
+            encoding, compressed_filename = precompressed
+            response = send_from_directory(app.static_folder, compressed_filename,
+                                           mimetype=mimetype, max_age=max_age)
+            response.headers['Content-Encoding'] = encoding
+        if mimetype in compressible:
+            response.vary.add('Accept-Encoding')
+        if original is not None:
+            response.cache_control.immutable = True
+        return response
+
+    app.view_functions['static'] = static
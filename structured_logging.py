@@ -0,0 +1,138 @@
+"""
+Structured logging for AI Travel Chatbot
+Hot paths log named events with fields through log_event() instead of
+formatting f-strings:
+
+    log_event('itinerary_created', destination=name, days=duration)
+
+Nothing is built when the level is filtered out, and events listed in
+Config.LOG_SAMPLE_RATES are kept only at that rate (the rate is written with
+each record so counts can be scaled back up). Events logged during a request
+carry its trace_id (see tracing.py). Records are handed to a queue
+and formatted (JSON lines by default) and written by a background thread (see
+background.py), so request threads never wait on log I/O. When the queue is full, records are
+dropped and counted rather than blocking.
+"""
+
+import json
+import logging
+import random
+import sys
+from datetime import datetime, timezone
+
+from flask import current_app, has_request_context, request
+from flask.logging import default_handler
+
+import metrics
+from background import BackgroundWriter
+from tracing import current_trace_id
+
+metrics.define('log_records_dropped_total', 'counter', 'Log records dropped because the log queue was full')
+
+_sample_rates = {}
+_state = {'logger': None}
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, event, message and the event's fields"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+        }
+        event = getattr(record, 'event', None)
+        if event is not None:
+            entry['event'] = event
+        else:
+            entry['message'] = record.getMessage()
+        entry.update(getattr(record, 'fields', {}))
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """Flask's usual text format, with event fields appended as key=value pairs"""
+
+    def __init__(self):
+        super().__init__('[%(asctime)s] %(levelname)s in %(module)s: %(message)s')
+
+    def formatMessage(self, record):
+        message = super().formatMessage(record)
+        fields = getattr(record, 'fields', None)
+        if fields:
+            message += ' ' + ' '.join(f"{key}={value!r}" for key, value in fields.items())
+        return message
+
+
+class LogWriter(BackgroundWriter):
+    """Writer thread that formats queued records and hands them to the real handler"""
+
+    thread_name = 'log-writer'
+
+    def __init__(self, handler, maxsize):
+        super().__init__(maxsize)
+        self.handler = handler
+
+    def drain(self, pending):
+        while True:
+            record = pending.get()
+            if record is None:
+                break
+            if record.levelno >= self.handler.level:
+                self.handler.handle(record)
+
+
+class NonBlockingQueueHandler(logging.Handler):
+    """Handler that leaves formatting to a writer thread and never waits for room in its queue"""
+
+    def __init__(self, handler, maxsize):
+        super().__init__()
+        self.writer = LogWriter(handler, maxsize)
+
+    def emit(self, record):
+        if not self.writer.put(record):
+            metrics.inc('log_records_dropped_total')
+
+    def close(self):
+        self.writer.stop()
+        super().close()
+
+
+def log_event(event, level=logging.INFO, /, exc_info=None, **fields):
+    """Log a named event with fields; filtered or sampled-out events cost almost nothing"""
+    logger = _state['logger'] or current_app.logger
+    if not logger.isEnabledFor(level):
+        return
+    rate = _sample_rates.get(event, 1.0)
+    if rate < 1.0:
+        if random.random() >= rate:
+            return
+        fields['sample_rate'] = rate
+    if has_request_context():
+        fields['endpoint'] = request.endpoint
+    trace_id = current_trace_id()
+    if trace_id is not None:
+        fields['trace_id'] = trace_id
+    logger.log(level, event, exc_info=exc_info, extra={'event': event, 'fields': fields}, stacklevel=2)
+
+
+def init_app(app):
+    """Send the app's log records through a queue to a JSON (or text) writer thread"""
+    _sample_rates.clear()
+    _sample_rates.update(app.config['LOG_SAMPLE_RATES'])
+
+    writer = logging.StreamHandler(sys.stderr)
+    writer.setFormatter(JSONFormatter() if app.config['LOG_FORMAT'] == 'json' else TextFormatter())
+
+    logger = app.logger
+    for handler in list(logger.handlers):
+        if handler is default_handler or isinstance(handler, NonBlockingQueueHandler):
+            logger.removeHandler(handler)
+            if handler is not default_handler:
+                handler.close()
+    logger.addHandler(NonBlockingQueueHandler(writer, app.config['LOG_QUEUE_SIZE']))
+    logger.setLevel(app.config['LOG_LEVEL'])
+    _state['logger'] = logger
@@ -0,0 +1,32 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from models import db  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({'TESTING': True,
+                      'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + str(tmp_path / 'test.db'),
+                      'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1000',
+                      'RATELIMIT_ENABLED': False,
+                      'PAGE_CACHE_TTL': 0,
+                      'TRACE_EXPORTER': 'none',
+                      'LOG_LEVEL': 'WARNING'})
+    app.instance_path = str(tmp_path)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+@pytest.fixture
+def client(app):
+    client = app.test_client()
+    client.post('/signup', data={'name': 'Test User', 'email': 'test@example.com',
+                                 'password': 'secret123', 'confirm_password': 'secret123'})
+    return client
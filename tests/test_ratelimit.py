@@ -0,0 +1,49 @@
+import pytest
+
+from app import create_app
+from models import db
+from ratelimit import MemoryBucketStore, SQLiteBucketStore
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    if request.param == 'sqlite':
+        return SQLiteBucketStore(str(tmp_path / 'ratelimit.db'), sweep_interval=10)
+    return MemoryBucketStore(stripes=1, sweep_interval=10)
+
+
+def test_sweep_keeps_buckets_judged_by_their_own_capacity(store):
+    # 2 requests per 100 s next to a route that refills within a second
+    assert store.consume('login:ip:1', 2, 0.02, now=1000)[0]
+    assert store.consume('login:ip:1', 2, 0.02, now=1000)[0]
+    assert store.consume('chat:ip:1', 100, 100, now=1000)[0]
+
+    store.sweep(now=1011)
+
+    allowed, retry_after = store.consume('login:ip:1', 2, 0.02, now=1011)
+    assert not allowed
+    assert retry_after > 0
+
+
+def test_sweep_forgets_full_buckets(store):
+    store.consume('chat:ip:1', 100, 100, now=1000)
+    store.sweep(now=1011)
+    assert store.consume('chat:ip:1', 1, 0.001, now=1011)[0]
+    assert not store.consume('chat:ip:1', 1, 0.001, now=1011)[0]
+
+
+@pytest.mark.parametrize('hops, statuses', [(0, [200, 200, 429, 429]), (1, [200, 200, 200, 200])])
+def test_forwarded_client_addresses_get_their_own_buckets(tmp_path, hops, statuses):
+    app = create_app({'TESTING': True,
+                      'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + str(tmp_path / 'test.db'),
+                      'RATELIMITS': {'main.login': (2, 60)},
+                      'PROXY_FIX_X_FOR': hops,
+                      'TRACE_EXPORTER': 'none',
+                      'LOG_LEVEL': 'WARNING'})
+    app.instance_path = str(tmp_path)
+    with app.app_context():
+        db.create_all()
+    client = app.test_client()
+    responses = [client.post('/login', data={'email': 'nobody@example.com', 'password': 'wrong'},
+                             headers={'X-Forwarded-For': f'203.0.113.{i % 2}'}) for i in range(4)]
+    assert [response.status_code for response in responses] == statuses
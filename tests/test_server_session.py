@@ -0,0 +1,34 @@
+from server_session import SQLiteSessionStore
+
+
+def session_id(app, client):
+    cookie = client.get_cookie(app.config['SESSION_COOKIE_NAME'])
+    return cookie.value if cookie is not None else None
+
+
+def test_session_id_rotates_on_login_and_logout(app, client):
+    store = app.session_interface.store
+    signed_up = session_id(app, client)
+    assert store.get_version(signed_up) is not None
+
+    client.get('/logout')
+    assert store.get_version(signed_up) is None
+    # The flashed message keeps an anonymous session, under a new id
+    logged_out = session_id(app, client)
+    assert logged_out not in (None, signed_up)
+
+    # Logging in on that id (or one planted beforehand) moves the session to a fresh one
+    client.post('/login', data={'email': 'test@example.com', 'password': 'secret123'})
+    logged_in = session_id(app, client)
+    assert logged_in not in (signed_up, logged_out)
+    assert store.get_version(logged_out) is None
+    assert client.get('/dashboard').status_code == 200
+
+
+def test_concurrent_update_of_the_same_version_loses(tmp_path):
+    store = SQLiteSessionStore(str(tmp_path / 'sessions.db'))
+    store.insert('a' * 32, b'{}', 2e9)
+
+    assert store.update('a' * 32, b'{"n": "first"}', 1, 2e9) == 2
+    assert store.update('a' * 32, b'{"n": "second"}', 1, 2e9) is None
+    assert store.load('a' * 32)[:2] == (b'{"n": "first"}', 2)
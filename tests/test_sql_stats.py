@@ -0,0 +1,44 @@
+import pytest
+
+from app import MOOD_DESTINATIONS
+from models import User
+from sql_stats import max_queries
+
+DESTINATIONS = [dest['name'] for dest in MOOD_DESTINATIONS['calm']['destinations']]
+
+
+def create_itineraries(client, count):
+    ids = []
+    for destination in DESTINATIONS[:count]:
+        response = client.post('/api/create_itinerary', json={'destination': destination, 'duration': 3,
+                                                               'start_date': '2026-12-01', 'mood': 'calm'})
+        assert response.status_code == 200
+        ids.append(response.get_json()['itinerary_id'])
+    return ids
+
+
+@pytest.mark.parametrize('count', [1, 3])
+def test_dashboard_queries_do_not_grow_with_itineraries(client, count):
+    create_itineraries(client, count)
+    with max_queries(4):
+        assert client.get('/dashboard').status_code == 200
+
+
+def test_itinerary_page_queries(client):
+    itinerary_id, = create_itineraries(client, 1)
+    with max_queries(2):
+        assert client.get(f'/itinerary/{itinerary_id}').status_code == 200
+
+
+@pytest.mark.parametrize('path', ['/api/itineraries', '/api/itineraries?full=1'])
+def test_itinerary_list_queries_do_not_grow_with_itineraries(client, path):
+    create_itineraries(client, 3)
+    with max_queries(2):
+        assert client.get(path).status_code == 200
+
+
+def test_max_queries_reports_statements(app):
+    with app.app_context():
+        with pytest.raises(AssertionError, match='at most 0 queries, ran 1'):
+            with max_queries(0):
+                User.query.first()
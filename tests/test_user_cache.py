@@ -0,0 +1,61 @@
+import pytest
+
+from models import db, User, user_cache
+from sql_stats import collect_queries
+
+
+@pytest.fixture(autouse=True)
+def empty_user_cache():
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
+
+def user_queries(stats):
+    return [statement for statement in stats.statements if 'FROM users' in statement]
+
+
+def test_cached_user_is_served_without_a_query(client):
+    assert client.get('/about').status_code == 200
+    for _ in range(2):
+        with collect_queries() as stats:
+            assert client.get('/about').status_code == 200
+        assert user_queries(stats) == []
+        assert user_cache.get(1) is not None
+
+
+def test_password_change_ends_sessions_on_other_workers(app, client):
+    other = app.test_client()
+    other.post('/login', data={'email': 'test@example.com', 'password': 'secret123'})
+    assert other.get('/dashboard').status_code == 200
+    assert client.get('/dashboard').status_code == 200
+    stale = dict(user_cache.get(1))
+
+    with app.app_context():
+        db.session.get(User, 1).set_password('changed123')
+        db.session.commit()
+    # Another worker's cache still holds the snapshot from before the change
+    user_cache.set(1, stale)
+
+    assert client.get('/dashboard').status_code == 302
+    assert other.get('/dashboard').status_code == 302
+
+
+def test_stale_snapshot_is_reloaded_for_a_new_login(app, client):
+    assert client.get('/dashboard').status_code == 200
+    stale = dict(user_cache.get(1))
+    with app.app_context():
+        db.session.get(User, 1).set_password('changed123')
+        db.session.commit()
+    user_cache.set(1, stale)
+
+    client.post('/login', data={'email': 'test@example.com', 'password': 'changed123'})
+    assert client.get('/dashboard').status_code == 200
+    assert user_cache.get(1)['password_hash'] != stale['password_hash']
+
+
+def test_deactivated_user_is_logged_out(app, client):
+    with app.app_context():
+        db.session.get(User, 1).is_active = False
+        db.session.commit()
+    assert client.get('/dashboard').status_code == 302
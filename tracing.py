@@ -0,0 +1,354 @@
+"""
+Request tracing for AI Travel Chatbot
+Gives every request a trace id (sent back in the X-Trace-Id header and added to
+log events) and, for sampled requests, records a tree of timed spans: the
+request itself, mood detection, catalog lookups, itinerary generation, JSON
+serialization and each database commit. Code adds its own spans with
+
+    with span('catalog.find_destination', destination=name):
+        ...
+
+or by decorating a function with @traced('chatbot.detect_mood').
+
+Sampling is decided once, at the head of the trace: TRACE_SAMPLE_RATE of
+requests are recorded. A W3C traceparent header from an upstream service is
+honoured, so its trace id is kept and its sampled flag decides. Spans in
+unsampled requests cost one context variable lookup.
+
+Finished traces are exported in OTLP/JSON, the format of the OpenTelemetry
+collector's file exporter. TRACE_EXPORTER = 'file' appends one line per trace
+to instance/traces.jsonl from a background thread (the collector's
+otlpjsonfile receiver reads it, and so does jq); 'memory' keeps recent spans
+in app.extensions['tracing'] for tests and debugging; 'none' only assigns ids.
+"""
+
+import json
+import os
+import random
+import re
+import time
+from collections import deque
+from contextvars import ContextVar
+from functools import wraps
+
+from flask import g, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+import metrics
+from background import BackgroundWriter
+
+SCOPE_NAME = 'paradiseride.tracing'
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+STATUS_UNSET = 0
+STATUS_ERROR = 2
+
+TRACEPARENT = re.compile(r'^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})')
+
+metrics.define('traces_dropped_total', 'counter', 'Traces dropped because the trace export queue was full')
+
+_current = ContextVar('trace_span', default=None)
+_listening = False
+_file_exporter = None
+
+
+class Trace:
+    """Spans finished so far in one request"""
+
+    def __init__(self, trace_id, sampled):
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.spans = []
+
+    def add(self, finished):
+        self.spans.append(finished)
+
+
+class Span:
+    """A timed operation; used as a context manager it becomes the parent of spans opened inside it"""
+
+    __slots__ = ('trace', 'span_id', 'parent_id', 'name', 'kind', 'attributes', 'start_ns', 'end_ns',
+                 'status', 'status_message', '_token')
+
+    def __init__(self, trace, name, parent_id=None, kind=KIND_INTERNAL, attributes=None):
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes or {}
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.status = STATUS_UNSET
+        self.status_message = ''
+        self._token = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def set_error(self, message):
+        self.status = STATUS_ERROR
+        self.status_message = message
+
+    def record_exception(self, exc):
+        self.attributes['exception.type'] = type(exc).__name__
+        self.set_error(str(exc))
+
+    def finish(self):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            self.trace.add(self)
+
+    def __enter__(self):
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None:
+            self.record_exception(exc)
+        _current.reset(self._token)
+        self.finish()
+        return False
+
+    def to_otlp(self):
+        encoded = {
+            'traceId': self.trace.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': self.kind,
+            'startTimeUnixNano': str(self.start_ns),
+            'endTimeUnixNano': str(self.end_ns or self.start_ns),
+            'attributes': otlp_attributes(self.attributes),
+            'status': {'code': self.status, 'message': self.status_message} if self.status else {}
+        }
+        if self.parent_id:
+            encoded['parentSpanId'] = self.parent_id
+        return encoded
+
+
+class _NoSpan:
+    """Stands in for a span when the request is not sampled"""
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NO_SPAN = _NoSpan()
+
+
+def otlp_value(value):
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def otlp_attributes(attributes):
+    return [{'key': key, 'value': otlp_value(value)} for key, value in attributes.items()]
+
+
+def otlp_document(spans, resource):
+    """One OTLP/JSON ExportTraceServiceRequest holding the given spans"""
+    return {'resourceSpans': [{
+        'resource': {'attributes': otlp_attributes(resource)},
+        'scopeSpans': [{'scope': {'name': SCOPE_NAME}, 'spans': [s.to_otlp() for s in spans]}]
+    }]}
+
+
+def current_span():
+    """The innermost recording span, or None outside sampled requests"""
+    parent = _current.get()
+    if parent is None or not parent.trace.sampled:
+        return None
+    return parent
+
+
+def current_trace_id():
+    """The current request's trace id, sampled or not; None outside a request"""
+    parent = _current.get()
+    return parent.trace.trace_id if parent is not None else None
+
+
+def span(name, **attributes):
+    """Context manager timing the block as a child of the current span (a no-op when not sampled)"""
+    parent = _current.get()
+    if parent is None or not parent.trace.sampled:
+        return NO_SPAN
+    return Span(parent.trace, name, parent.span_id, attributes=attributes)
+
+
+def traced(name):
+    """Decorator recording each call of the function as a span"""
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            parent = _current.get()
+            if parent is None or not parent.trace.sampled:
+                return func(*args, **kwargs)
+            with Span(parent.trace, name, parent.span_id):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def parse_traceparent(header):
+    """(trace_id, parent_span_id, sampled) from a W3C traceparent header, or None if it is unusable"""
+    match = TRACEPARENT.match(header or '')
+    if not match:
+        return None
+    version, trace_id, parent_id, flags = match.groups()
+    if version == 'ff' or trace_id == '0' * 32 or parent_id == '0' * 16:
+        return None
+    return trace_id, parent_id, bool(int(flags, 16) & 1)
+
+
+def _start_commit_span(session):
+    parent = _current.get()
+    if parent is not None and parent.trace.sampled:
+        session.info['trace_commit_span'] = Span(parent.trace, 'db.commit', parent.span_id)
+
+
+def _end_commit_span(session):
+    commit_span = session.info.pop('trace_commit_span', None)
+    if commit_span is not None:
+        commit_span.finish()
+
+
+def _fail_commit_span(session):
+    commit_span = session.info.pop('trace_commit_span', None)
+    if commit_span is not None:
+        commit_span.set_error('rolled back')
+        commit_span.finish()
+
+
+def listen():
+    """Attach the session commit listeners once per process"""
+    global _listening
+    if not _listening:
+        event.listen(Session, 'before_commit', _start_commit_span)
+        event.listen(Session, 'after_commit', _end_commit_span)
+        event.listen(Session, 'after_rollback', _fail_commit_span)
+        _listening = True
+
+
+class MemoryExporter:
+    """Keeps the most recent finished spans in memory"""
+
+    def __init__(self, maxlen=10000):
+        self.spans = deque(maxlen=maxlen)
+
+    def export(self, spans):
+        self.spans.extend(spans)
+
+    def finished_spans(self, trace_id=None):
+        return [s for s in self.spans if trace_id is None or s.trace.trace_id == trace_id]
+
+    def clear(self):
+        self.spans.clear()
+
+
+class FileExporter(BackgroundWriter):
+    """Appends one OTLP/JSON line per trace from a writer thread; traces are dropped when it falls behind
+
+    The file is moved to <name>.1 once it grows past max_bytes.
+    """
+
+    thread_name = 'trace-writer'
+
+    def __init__(self, path, resource, maxsize=1000, max_bytes=50 * 1024 * 1024):
+        super().__init__(maxsize)
+        self.path = path
+        self.resource = resource
+        self.max_bytes = max_bytes
+
+    def export(self, spans):
+        if not self.put(spans):
+            metrics.inc('traces_dropped_total')
+
+    def drain(self, pending):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        f = open(self.path, 'a', encoding='utf-8')
+        try:
+            while True:
+                spans = pending.get()
+                if spans is None:
+                    break
+                f.write(json.dumps(otlp_document(spans, self.resource), separators=(',', ':')) + '\n')
+                if pending.empty():
+                    f.flush()
+                if f.tell() > self.max_bytes:
+                    f.close()
+                    os.replace(self.path, self.path + '.1')
+                    f = open(self.path, 'a', encoding='utf-8')
+        finally:
+            f.close()
+
+
+def init_app(app):
+    """Give each request a trace id and record and export spans for the sampled ones"""
+    global _file_exporter
+    if not app.config['TRACING_ENABLED']:
+        return
+    listen()
+    sample_rate = app.config['TRACE_SAMPLE_RATE']
+    resource = {'service.name': app.config['TRACE_SERVICE_NAME'], 'service.version': app.config['APP_VERSION']}
+    if app.config['TRACE_EXPORTER'] == 'file':
+        exporter = FileExporter(os.path.join(app.instance_path, app.config['TRACE_FILE']), resource,
+                                app.config['TRACE_QUEUE_SIZE'], app.config['TRACE_FILE_MAX_BYTES'])
+        # Flush the writer of an app created earlier in this process, as the log setup replaces its handler;
+        # it starts again if that app still exports
+        if _file_exporter is not None:
+            _file_exporter.stop()
+        _file_exporter = exporter
+    elif app.config['TRACE_EXPORTER'] == 'memory':
+        exporter = MemoryExporter()
+    else:
+        exporter = None
+    app.extensions['tracing'] = exporter
+
+    @app.before_request
+    def start_trace():
+        upstream = parse_traceparent(request.headers.get('traceparent'))
+        if upstream is not None:
+            trace_id, parent_id, sampled = upstream
+        else:
+            trace_id, parent_id, sampled = os.urandom(16).hex(), None, random.random() < sample_rate
+        trace = Trace(trace_id, sampled and exporter is not None)
+        route = request.url_rule.rule if request.url_rule is not None else request.path
+        attributes = {'http.request.method': request.method, 'http.route': route,
+                      'url.path': request.path} if trace.sampled else None
+        root = Span(trace, f"{request.method} {route}", parent_id, KIND_SERVER, attributes)
+        g.trace_root = root
+        g.trace_token = _current.set(root)
+
+    @app.after_request
+    def tag_trace(response):
+        root = g.get('trace_root')
+        if root is None:
+            return response
+        response.headers['X-Trace-Id'] = root.trace.trace_id
+        if root.trace.sampled:
+            root.set_attribute('http.response.status_code', response.status_code)
+            if response.status_code >= 500:
+                root.set_error(response.status)
+        return response
+
+    @app.teardown_request
+    def end_trace(exc):
+        root = g.pop('trace_root', None)
+        if root is None:
+            return
+        _current.reset(g.pop('trace_token'))
+        if not root.trace.sampled:
+            return
+        if exc is not None:
+            root.record_exception(exc)
+        root.finish()
+        exporter.export(list(root.trace.spans))
@@ -0,0 +1,9 @@
+"""
+WSGI entry point for AI Travel Chatbot
+Serve with e.g. `gunicorn wsgi:app`. Creating the app has no database side
+effects; create tables and the demo user once with `flask init-db`.
+"""
+
+from app import create_app
+
+app = create_app()